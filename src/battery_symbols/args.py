@@ -0,0 +1,59 @@
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from typing import TYPE_CHECKING
+
+from battery_symbols.runtime import CASE_WIDTH, LEVEL_STEPS
+
+if TYPE_CHECKING:
+    from battery_symbols.generate import BuildMatrix
+
+# Command line options shared by the build entry points.  They live here
+# rather than in runtime, which only uses the standard library lookups a
+# status bar needs.
+
+
+def positive_int(value: str) -> int:
+    """
+    Parse a command line option that must be a whole number above zero.
+    """
+    number = int(value)
+    if number <= 0:
+        raise ArgumentTypeError(f"must be positive, got {number}")
+    return number
+
+
+def add_matrix_arguments(parser: ArgumentParser, verb: str = "build") -> None:
+    """
+    Add the ``--steps`` and ``--widths`` options shared by the build entry
+    points, read back by ``matrix_from_args``.
+
+    Args:
+        parser: The parser to add them to.
+        verb: What the entry point does with the glyphs, for the help text.
+    """
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=LEVEL_STEPS,
+        help=f"Levels per full charge, a power of ten (default: {LEVEL_STEPS}).",
+    )
+    parser.add_argument(
+        "--widths",
+        type=int,
+        nargs="+",
+        default=[CASE_WIDTH],
+        help=f"The case widths to {verb} (default: {CASE_WIDTH}).",
+    )
+
+
+def matrix_from_args(parser: ArgumentParser, args: Namespace) -> "BuildMatrix":
+    """
+    Get the build matrix for the options added by ``add_matrix_arguments``,
+    exiting with a usage error if they don't make one.
+    """
+    # Imported here because generate needs the build stack.
+    from battery_symbols.generate import BuildMatrix
+
+    try:
+        return BuildMatrix(steps=args.steps, widths=args.widths)
+    except ValueError as e:
+        parser.error(str(e))
@@ -0,0 +1,423 @@
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Optional
+
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+from battery_symbols import create, export, generate, svgwriter, watch
+from battery_symbols.cache import package_version
+from battery_symbols.codepoints import CodepointIndex
+from battery_symbols.config import FONTS_DIR
+from battery_symbols.generate import (
+    BATTERY_STYLES,
+    BuildMatrix,
+    GlyphJob,
+    glyph_jobs,
+    make_battery,
+)
+from battery_symbols.output import OutputReport
+
+DEFAULT_LEVELS = [101, 1001, 10001]
+DEFAULT_TOLERANCE = 0.2
+# Seconds a benchmark may take at most, whatever the baseline says.  A watch
+# update after an edit has to stay under a second to keep up with the editor.
+BUDGETS = {"watch/update": 1.0}
+# Glyphs the watch benchmark re-renders, about what an edit to one part of a
+# style's drawing changes.
+WATCH_GLYPHS = 10
+FONT_PATH = FONTS_DIR / "OpenSans-Variable.ttf"
+
+RUNTIME_MODULE = "battery_symbols.runtime"
+# Top level packages the runtime lookup module must never pull in.
+HEAVY_PACKAGES = {"skia", "fontTools", "mistletoe", "svgwrite", "svg", "numpy"}
+
+# "<benchmark>[<levels>]" -> {"seconds": best, "median": median, "items": glyphs}
+Results = dict[str, dict[str, float]]
+
+
+def _bench_matrix(levels: int, styles: Optional[tuple[int, ...]] = None) -> BuildMatrix:
+    """
+    Get the build matrix with ``levels`` levels per style and charge state, so
+    every level is its own glyph, e.g. per-mille levels for 1001.
+
+    Raises:
+        ValueError: If ``levels - 1`` isn't a power of ten.
+    """
+    return BuildMatrix(styles=styles, steps=levels - 1)
+
+
+def _time(func: Callable[[], Any], repeat: int) -> tuple[float, float]:
+    """
+    Run ``func`` ``repeat`` times.
+
+    :return: tuple of (best time, median time) in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        with redirect_stdout(StringIO()):
+            func()
+        timings.append(perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+class Benchmark:
+    """Collects timings for a run of the suite."""
+
+    def __init__(self, repeat: int, verbose: bool = True):
+        self.repeat = repeat
+        self.verbose = verbose
+        self.results: Results = {}
+
+    def run(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        items: int,
+        repeat: Optional[int] = None,
+    ) -> None:
+        best, median = _time(func, repeat or self.repeat)
+        self.record(name, best, median, items)
+
+    def record(self, name: str, best: float, median: float, items: int) -> None:
+        self.results[name] = {"seconds": best, "median": median, "items": items}
+        if self.verbose:
+            rate = items / best if best else float("inf")
+            print(f"{name:<45} {best:>10.4f}s {rate:>12.1f} glyphs/s", file=sys.stderr)
+
+
+def _import_time(module: str) -> tuple[float, set[str]]:
+    """
+    Import a module in a fresh interpreter.
+
+    :return: tuple of (seconds spent importing the module and its package,
+        top level packages loaded in the process)
+    """
+    code = (
+        f"import sys, {module}; "
+        "print('\\n'.join({name.partition('.')[0] for name in sys.modules}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # importtime lines look like "import time: self [us] | cumulative | name".
+    # Sum the cumulative time of the module and the packages above it.
+    parents = module.split(".")
+    names = {".".join(parents[: i + 1]) for i in range(len(parents))}
+    microseconds = 0
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] in names:
+            microseconds += int(fields[1])
+    return microseconds / 1e6, set(result.stdout.split())
+
+
+def _import_benchmarks(bench: Benchmark) -> None:
+    """
+    Time a cold import of the runtime lookup module, and make sure it doesn't
+    load any of the build dependencies.
+
+    Raises:
+        RuntimeError: If importing the runtime module loads a heavy package.
+    """
+    timings = []
+    for _ in range(bench.repeat):
+        seconds, loaded = _import_time(RUNTIME_MODULE)
+        heavy = loaded & HEAVY_PACKAGES
+        if heavy:
+            raise RuntimeError(
+                f"Importing {RUNTIME_MODULE} loads {', '.join(sorted(heavy))}"
+            )
+        timings.append(seconds)
+    bench.record("import/runtime", min(timings), statistics.median(timings), 1)
+
+
+def _glyph_benchmarks(bench: Benchmark, levels: int, work_dir: Path) -> None:
+    """Per glyph type microbenchmarks: construction, build_svg and drawing."""
+    for style_index in range(len(BATTERY_STYLES)):
+        _style_benchmarks(bench, style_index, levels, work_dir)
+
+
+def _style_benchmarks(  # noqa: C901
+    bench: Benchmark, style_index: int, levels: int, work_dir: Path
+) -> None:
+    style_name = BATTERY_STYLES[style_index][1]
+    # Alternate charge states so both variants are measured: charging at even
+    # levels and discharging at odd ones.
+    jobs: list[GlyphJob] = [
+        job
+        for job in glyph_jobs(_bench_matrix(levels, (style_index,)))
+        if job[1] == (job[2] % 2 == 0)
+    ]
+    batteries = [make_battery(job, FONT_PATH) for job in jobs]
+    svg_dir = work_dir / f"glyph_{style_name}_{levels}"
+    svg_dir.mkdir()
+    svg_paths = [svg_dir / f"{i:05}.svg" for i in range(levels)]
+
+    def construct() -> None:
+        for job in jobs:
+            make_battery(job, FONT_PATH)
+
+    def render_svg() -> None:
+        # Start cold, like every worker process of a build does.
+        svgwriter.clear_cache()
+        for battery in batteries:
+            battery.render_svg()
+
+    def build_svg() -> None:
+        for battery, svg_path in zip(batteries, svg_paths, strict=True):
+            battery.build_svg(svg_path)
+
+    def draw_scaled() -> None:
+        for svg_path in svg_paths:
+            create.draw_scaled(svg_path, TTGlyphPen(None))
+
+    def draw_battery_scaled() -> None:
+        for battery in batteries:
+            create.draw_battery_scaled(battery, TTGlyphPen(None))
+
+    def battery_glyph() -> None:
+        for battery in batteries:
+            create.battery_glyph(battery)
+
+    prefix = f"glyph/{style_name}"
+    bench.run(f"{prefix}/construct[{levels}]", construct, levels)
+    bench.run(f"{prefix}/render_svg[{levels}]", render_svg, levels)
+    bench.run(f"{prefix}/build_svg[{levels}]", build_svg, levels)
+    bench.run(f"{prefix}/draw_scaled[{levels}]", draw_scaled, levels)
+    bench.run(f"{prefix}/draw_battery_scaled[{levels}]", draw_battery_scaled, levels)
+    bench.run(f"{prefix}/battery_glyph[{levels}]", battery_glyph, levels)
+
+
+def _stage_benchmarks(bench: Benchmark, levels: int, work_dir: Path) -> None:
+    """Whole pipeline stages, run on every style and state at ``levels`` levels."""
+    matrix = _bench_matrix(levels)
+    count = len(matrix)
+    raw_dir = work_dir / f"raw_{levels}"
+    examples_dir = work_dir / f"examples_{levels}"
+    font_file = work_dir / f"font_{levels}.ttf"
+    raw_dir.mkdir()
+    examples_dir.mkdir()
+
+    # Stages depend on each other's output, so each one only runs once.  The
+    # render runs the way a build does: sharded across the worker pool, with
+    # the manifest checked and the SVGs written in the background.
+    bench.run(
+        f"stage/generate[{levels}]",
+        lambda: generate.generate(
+            raw_dir, FONT_PATH, matrix=matrix, report=OutputReport()
+        ),
+        count,
+        repeat=1,
+    )
+    svgs = create.gather_svgs(raw_dir)
+    # A scratch index, so the benchmark glyphs never end up in the project's.
+    codepoints = CodepointIndex(None)
+    bench.run(
+        f"stage/build_font[{levels}]",
+        lambda: create.build_font(svgs, font_file, codepoints=codepoints),
+        count,
+        repeat=1,
+    )
+    bench.run(
+        f"stage/build_font_composite[{levels}]",
+        lambda: create.build_font(
+            svgs,
+            work_dir / f"composite_{levels}.ttf",
+            composite=True,
+            codepoints=codepoints,
+        ),
+        count,
+        repeat=1,
+    )
+    battery_names: list[str] = []
+    bench.run(
+        f"stage/samples[{levels}]",
+        lambda: battery_names.extend(
+            create.extract_and_save_sample_glyphs(font_file, examples_dir)
+        ),
+        count,
+        repeat=1,
+    )
+    bench.run(
+        f"stage/cheatsheet[{levels}]",
+        lambda: create.write_cheatsheet(examples_dir, work_dir, battery_names),
+        count,
+        repeat=1,
+    )
+    bench.run(
+        f"stage/export[{levels}]", lambda: export.extract_glyphs(font_file), count
+    )
+
+
+def _watch_benchmarks(bench: Benchmark, work_dir: Path) -> None:
+    """
+    Time a watch session's update after an edit, with the font and samples
+    of the default glyphs already built.  The edit is simulated by deleting a
+    few glyph SVGs, which the update renders, patches into the font and saves
+    samples of.
+    """
+    raw_dir = work_dir / "watch_raw"
+    watcher = watch.Watcher(
+        work_dir / "watch.ttf",
+        raw_dir=raw_dir,
+        examples_dir=work_dir / "watch_examples",
+    )
+    with redirect_stdout(StringIO()):
+        watcher.update()
+    edited = generate.glyph_jobs()[:WATCH_GLYPHS]
+
+    def update() -> None:
+        for job in edited:
+            generate.glyph_path(raw_dir, job).unlink()
+        watcher.update()
+
+    bench.run("watch/update", update, len(edited))
+
+
+def run_benchmarks(
+    levels: list[int], repeat: int = 3, verbose: bool = True
+) -> dict[str, Any]:
+    """
+    Run the full suite.
+
+    Args:
+        levels: The level counts to run each benchmark at.
+        repeat: How many times to repeat the repeatable benchmarks.
+        verbose: Print each result to stderr as it finishes.
+
+    Returns:
+        The machine-readable report, with ``meta`` and ``results`` keys.
+    """
+    bench = Benchmark(repeat, verbose)
+    with TemporaryDirectory(prefix="battery-symbols-bench-") as tmp:
+        work_dir = Path(tmp)
+        _import_benchmarks(bench)
+        _watch_benchmarks(bench, work_dir)
+        for level_count in levels:
+            _glyph_benchmarks(bench, level_count, work_dir)
+            _stage_benchmarks(bench, level_count, work_dir)
+
+    return {
+        "meta": {
+            "version": package_version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "levels": levels,
+            "repeat": repeat,
+        },
+        "results": bench.results,
+    }
+
+
+def compare(
+    results: Results, baseline: Results, tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """
+    Compare results to a stored baseline.
+
+    Args:
+        results: The results of this run.
+        baseline: The results of a previous run.
+        tolerance: How much slower (as a fraction) a benchmark may get before
+            it is flagged.
+
+    Returns:
+        A description of every regression, empty if there are none.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["seconds"]
+        after = result["seconds"]
+        if before > 0 and after > before * (1 + tolerance):
+            regressions.append(
+                f"{name}: {before:.4f}s -> {after:.4f}s (+{after / before - 1:.0%})"
+            )
+    return regressions
+
+
+def over_budget(results: Results) -> list[str]:
+    """
+    Check the results against ``BUDGETS``.
+
+    Returns:
+        A description of every benchmark that took longer than its budget.
+    """
+    return [
+        f"{name}: {results[name]['seconds']:.4f}s, budget {budget:.4f}s"
+        for name, budget in BUDGETS.items()
+        if name in results and results[name]["seconds"] > budget
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(description="Benchmark the glyph and font pipeline.")
+    parser.add_argument(
+        "-n",
+        "--levels",
+        type=lambda value: [int(levels) for levels in value.split(",")],
+        default=DEFAULT_LEVELS,
+        help="Comma separated level counts to benchmark, each a power of ten plus "
+        "one (default: 101,1001,10001).",
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=3, help="Repeats per microbenchmark."
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Write the JSON results to this file."
+    )
+    parser.add_argument(
+        "-b", "--baseline", type=Path, help="Compare against a stored JSON result."
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown against the baseline before flagging (default: 0.2).",
+    )
+    args = parser.parse_args(argv)
+    for levels in args.levels:
+        try:
+            _bench_matrix(levels)
+        except ValueError as e:
+            parser.error(f"can't benchmark {levels} levels: {e}")
+
+    report = run_benchmarks(args.levels, args.repeat)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    failures = over_budget(report["results"])
+    for failure in failures:
+        print(f"Over budget: {failure}", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        failures += regressions
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import inspect
+import json
+from functools import cache
+from hashlib import sha256
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Optional
+
+from battery_symbols import fonts, models, paths, pens, svgwriter
+from battery_symbols.config import SVG_PRECISION
+from battery_symbols.hashing import file_digest
+from battery_symbols.models import Battery
+from battery_symbols.output import write_if_changed
+
+MANIFEST_VERSION = 1
+
+
+@cache
+def package_version() -> str:
+    try:
+        return version("battery-symbols")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _battery_styles() -> list[type[Battery]]:
+    """Every Battery subclass, however deeply nested."""
+    styles: list[type[Battery]] = []
+    pending: list[type[Battery]] = Battery.__subclasses__()
+    while pending:
+        style = pending.pop()
+        styles.append(style)
+        pending.extend(style.__subclasses__())
+    return styles
+
+
+@cache
+def style_digest(battery_class: type[Battery]) -> str:
+    """
+    Hash the source that determines what a battery style looks like.
+
+    The source of every *other* style in ``models.py`` is left out, so editing
+    one style's geometry only invalidates that style's glyphs, while editing a
+    shared component (e.g. BatteryCase, the outlines in ``paths.py`` or the
+    digit layout in ``fonts.py``) invalidates all of them.
+
+    Args:
+        battery_class: The style to hash.
+
+    Returns:
+        The hex SHA-256 digest of the relevant source.
+    """
+    source = inspect.getsource(models)
+    for other in _battery_styles():
+        if other is not battery_class and inspect.getmodule(other) is models:
+            source = source.replace(inspect.getsource(other), "")
+    source += inspect.getsource(paths) + inspect.getsource(fonts)
+    return sha256(source.encode()).hexdigest()
+
+
+@cache
+def writer_digest() -> str:
+    """
+    Hash the source of the SVG writer and the pens it draws paths with, so
+    changing how glyphs are written invalidates them too.
+    """
+    source = inspect.getsource(svgwriter) + inspect.getsource(pens)
+    return sha256(source.encode()).hexdigest()
+
+
+def glyph_key(
+    battery_class: type[Battery],
+    width: float,
+    charging: bool,
+    level: float,
+    font_path: Path,
+    precision: int = SVG_PRECISION,
+    merge: bool = False,
+) -> str:
+    """
+    Build the cache key for a glyph from everything that goes into rendering it.
+
+    Returns:
+        The hex SHA-256 digest of the glyph's inputs.
+    """
+    inputs = {
+        "class": f"{battery_class.__module__}.{battery_class.__qualname__}",
+        "style": style_digest(battery_class),
+        "writer": writer_digest(),
+        "precision": precision,
+        "merge": merge,
+        "width": width,
+        "charging": charging,
+        "level": level,
+        "font": file_digest(font_path),
+        "version": package_version(),
+    }
+    return sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+class BuildManifest:
+    """
+    Records the cache key each generated glyph was rendered from, so unchanged
+    glyphs can be skipped on the next run.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.glyphs: dict[str, str] = {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.glyphs = data.get("glyphs", {})
+
+    def is_current(
+        self, output_file: Path, key: str, exists: Optional[bool] = None
+    ) -> bool:
+        """
+        Check whether a glyph was already rendered from the same inputs.
+
+        Args:
+            output_file: Where the glyph was written.
+            key: The glyph's cache key, see ``glyph_key``.
+            exists: Whether the glyph is still there, if it wasn't written to
+                ``output_file`` itself.  By default the file is checked.
+        """
+        if self.glyphs.get(self._name(output_file)) != key:
+            return False
+        return output_file.exists() if exists is None else exists
+
+    def record(self, output_file: Path, key: str) -> None:
+        self.glyphs[self._name(output_file)] = key
+
+    def prune(self, keep: set[Path]) -> None:
+        """
+        Forget every glyph that is not in ``keep``.
+        """
+        names = {self._name(output_file) for output_file in keep}
+        self.glyphs = {k: v for k, v in self.glyphs.items() if k in names}
+
+    def save(self) -> bool:
+        """
+        Returns:
+            Whether the file was written, see ``write_if_changed``.
+        """
+        data = json.dumps(
+            {"version": MANIFEST_VERSION, "glyphs": self.glyphs},
+            indent=1,
+            sort_keys=True,
+        )
+        return write_if_changed(self.path, data.encode())
+
+    def _name(self, output_file: Path) -> str:
+        return output_file.relative_to(self.path.parent).as_posix()
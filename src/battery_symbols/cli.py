@@ -0,0 +1,441 @@
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable
+from pathlib import Path
+from typing import Optional
+
+from battery_symbols.args import (
+    add_matrix_arguments,
+    matrix_from_args,
+    positive_int,
+)
+from battery_symbols.config import (
+    ATLAS_COLUMNS,
+    FONT_FILE,
+    RASTER_DIR,
+    RASTER_SIZES,
+    RAW_DIR,
+    README_FILE,
+    SAMPLE_STEP,
+    SVG_PRECISION,
+    WRITER_THREADS,
+    VARIABLE_FONT_FILE,
+    WATCH_INTERVAL,
+)
+from battery_symbols.export import FORMATS
+from battery_symbols.output import OutputReport
+from battery_symbols.profiling import (
+    StageProfiler,
+    add_profile_arguments,
+    profiler_from_args,
+)
+from battery_symbols.runtime import STYLE_NAMES
+from battery_symbols.store import STORE_NAME
+
+# Each subcommand imports the modules it needs when it runs, so ``--help`` and
+# ``export`` never load skia, svg.py, mistletoe or svgwrite.
+
+Handler = Callable[[Namespace, StageProfiler, OutputReport], None]
+ArgumentAdder = Callable[[ArgumentParser], None]
+
+
+def _generate(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    from battery_symbols.generate import generate
+
+    matrix = args.matrix
+    RAW_DIR.mkdir(parents=True, exist_ok=True)
+    rendered = generate(
+        RAW_DIR,
+        workers=args.workers,
+        force=args.force,
+        profiler=profiler,
+        precision=args.precision,
+        merge=args.merge,
+        matrix=matrix,
+        report=report,
+        writers=args.writers,
+        packed=args.packed,
+    )
+    print(f"Rendered {len(rendered)} of {len(matrix)} glyphs.")
+
+
+def _build(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    from battery_symbols.create import run_build
+
+    run_build(
+        args.font,
+        args.from_models,
+        profiler,
+        args.composite,
+        args.matrix,
+        report,
+        args.packed,
+    )
+    if args.variable:
+        from battery_symbols.variable import build_variable_font
+
+        build_variable_font(args.variable, profiler=profiler, report=report)
+    if args.web or args.subset_styles or args.subset_step:
+        from battery_symbols.create import run_web_fonts
+
+        run_web_fonts(
+            args.font,
+            args.web,
+            args.subset_styles,
+            args.subset_step,
+            profiler,
+            report,
+        )
+
+
+def _run_samples(
+    args: Namespace, profiler: StageProfiler, report: OutputReport
+) -> list[str]:
+    from battery_symbols.create import run_samples
+
+    return run_samples(args.font, args.sample_step, args.threads, profiler, report)
+
+
+def _samples(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    _run_samples(args, profiler, report)
+
+
+def _cheatsheet(
+    args: Namespace,
+    profiler: StageProfiler,
+    report: OutputReport,
+    battery_name_list: Optional[list[str]] = None,
+) -> None:
+    from battery_symbols.create import read_battery_style_names, run_cheatsheet
+
+    if battery_name_list is None:
+        battery_name_list = read_battery_style_names(args.font)
+    run_cheatsheet(battery_name_list, README_FILE, profiler, report)
+
+
+def _all(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    if not args.from_models:
+        _generate(args, profiler, report)
+    _build(args, profiler, report)
+    _cheatsheet(args, profiler, report, _run_samples(args, profiler, report))
+
+
+def _export(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    from battery_symbols.export import run_export
+
+    run_export(args.font, args.format, args.output, not args.no_cache, profiler)
+
+
+def _unpack(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    from battery_symbols.store import unpack
+
+    with profiler.stage("unpack") as timing:
+        paths = unpack(args.store, args.output, args.writers, report)
+        timing.items = len(paths)
+    print(f"Unpacked {len(paths)} glyphs.")
+
+
+def _raster(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    from battery_symbols.raster import write_atlases
+
+    index = write_atlases(
+        args.output,
+        tuple(args.sizes),
+        args.matrix,
+        columns=args.columns,
+        profiler=profiler,
+        report=report,
+    )
+    print(f"Drew {len(index['atlases'])} atlases.")
+
+
+def _watch(args: Namespace, profiler: StageProfiler, report: OutputReport) -> None:
+    from battery_symbols.watch import Watcher
+
+    Watcher(args.font, args.workers, args.sample_step, profiler, args.matrix).run(
+        args.interval
+    )
+
+
+def _add_font_argument(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--font",
+        type=Path,
+        default=FONT_FILE,
+        help="The font file to write or read (default: the font in the project root).",
+    )
+
+
+def _add_store_argument(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--packed",
+        action="store_true",
+        help="Keep the glyph SVGs in a single glyph store instead of loose files.",
+    )
+
+
+def _add_generate_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count, 1 disables the pool).",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Render every glyph, even ones that are unchanged since the last run.",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=SVG_PRECISION,
+        help=f"Decimal places kept in the SVG coordinates (default: {SVG_PRECISION}).",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Union each glyph's shapes into a single SVG path.",
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=WRITER_THREADS,
+        help=f"Number of threads writing the SVGs, 0 writes them in between renders (default: {WRITER_THREADS}).",
+    )
+
+
+def _add_build_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--from-models",
+        action="store_true",
+        help="Draw the glyphs straight from the battery models instead of the SVGs in the build directory.",
+    )
+    parser.add_argument(
+        "--composite",
+        action="store_true",
+        help="Store outlines shared between glyphs once, as composite glyph components.",
+    )
+    parser.add_argument(
+        "--variable",
+        type=Path,
+        nargs="?",
+        const=VARIABLE_FONT_FILE,
+        metavar="FILE",
+        help=f"Also build a variable font of the simple discharging battery only, with a level axis (default: {VARIABLE_FONT_FILE.name}).",
+    )
+
+
+def _add_web_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--web",
+        action="store_true",
+        help="Also write WOFF and WOFF2 copies of the font.",
+    )
+    parser.add_argument(
+        "--subset-styles",
+        nargs="+",
+        choices=STYLE_NAMES,
+        help="Also write a WOFF/WOFF2 subset with only these styles.",
+    )
+    parser.add_argument(
+        "--subset-step",
+        type=positive_int,
+        help="Also write a WOFF/WOFF2 subset with only the levels that are a multiple of this.",
+    )
+
+
+def _add_samples_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--sample-step",
+        type=positive_int,
+        default=SAMPLE_STEP,
+        help=f"Save a sample SVG for every level that's a multiple of this (default: {SAMPLE_STEP}).",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Number of threads used to write the sample SVGs.",
+    )
+
+
+def _add_export_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        default="print",
+        help="Output format (default: print).",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Write to this file instead of stdout."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always read the font instead of using the cached mapping.",
+    )
+
+
+def _add_unpack_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=RAW_DIR / STORE_NAME,
+        help="The glyph store to unpack (default: the one in the build directory).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=RAW_DIR,
+        help="The directory to write the SVGs under (default: the build directory).",
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=WRITER_THREADS,
+        help=f"Number of threads writing the SVGs (default: {WRITER_THREADS}).",
+    )
+
+
+def _add_raster_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=RASTER_DIR,
+        help="The directory to write the atlases to (default: the build directory).",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=positive_int,
+        nargs="+",
+        default=list(RASTER_SIZES),
+        help=f"Pixel sizes to draw the glyphs at (default: {' '.join(map(str, RASTER_SIZES))}).",
+    )
+    parser.add_argument(
+        "--columns",
+        type=positive_int,
+        default=ATLAS_COLUMNS,
+        help=f"Glyphs per atlas row (default: {ATLAS_COLUMNS}).",
+    )
+
+
+def _add_watch_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes for the first build (default: CPU count, 1 disables the pool).",
+    )
+    parser.add_argument(
+        "--sample-step",
+        type=positive_int,
+        default=SAMPLE_STEP,
+        help=f"Save a sample SVG for every level that's a multiple of this (default: {SAMPLE_STEP}).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help=f"Seconds between checks for changes (default: {WATCH_INTERVAL}).",
+    )
+
+
+# name -> (help, handler, argument adders)
+SUBCOMMANDS: dict[str, tuple[str, Handler, list[ArgumentAdder]]] = {
+    "generate": (
+        "Render the battery glyph SVGs.",
+        _generate,
+        [_add_generate_arguments, add_matrix_arguments, _add_store_argument],
+    ),
+    "build": (
+        "Build the font.",
+        _build,
+        [
+            _add_font_argument,
+            add_matrix_arguments,
+            _add_store_argument,
+            _add_build_arguments,
+            _add_web_arguments,
+        ],
+    ),
+    "samples": (
+        "Save sample SVGs from the font.",
+        _samples,
+        [_add_font_argument, _add_samples_arguments],
+    ),
+    "cheatsheet": (
+        "Update the cheatsheet in the README.",
+        _cheatsheet,
+        [_add_font_argument],
+    ),
+    "export": (
+        "Print the glyph names and characters.",
+        _export,
+        [_add_font_argument, _add_export_arguments],
+    ),
+    "all": (
+        "Run generate, build, samples and cheatsheet in one process.",
+        _all,
+        [
+            _add_font_argument,
+            _add_generate_arguments,
+            add_matrix_arguments,
+            _add_store_argument,
+            _add_build_arguments,
+            _add_web_arguments,
+            _add_samples_arguments,
+        ],
+    ),
+    "raster": (
+        "Draw the glyphs into sprite atlas PNGs with a JSON index.",
+        _raster,
+        [add_matrix_arguments, _add_raster_arguments],
+    ),
+    "unpack": (
+        "Unpack the glyph store into loose SVGs.",
+        _unpack,
+        [_add_unpack_arguments],
+    ),
+    "watch": (
+        "Rebuild the glyphs, font and samples whenever the models or assets change.",
+        _watch,
+        [_add_font_argument, add_matrix_arguments, _add_watch_arguments],
+    ),
+}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(
+        prog="battery-symbols", description="Build and query the battery symbols font."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparser_by_name = {}
+    for name, (description, _handler, adders) in SUBCOMMANDS.items():
+        subparser = subparsers.add_parser(
+            name, help=description, description=description
+        )
+        for add_arguments in adders:
+            add_arguments(subparser)
+        add_profile_arguments(subparser)
+        subparser_by_name[name] = subparser
+    args = parser.parse_args(argv)
+    if add_matrix_arguments in SUBCOMMANDS[args.command][2]:
+        # Checked before running anything, so a bad matrix is a usage error.
+        args.matrix = matrix_from_args(subparser_by_name[args.command], args)
+    profiler = profiler_from_args(args)
+    report = OutputReport()
+
+    SUBCOMMANDS[args.command][1](args, profiler, report)
+    if report.written or report.unchanged:
+        print(report.summary())
+    profiler.write(args.profile_output)
+
+
+if __name__ == "__main__":
+    main()
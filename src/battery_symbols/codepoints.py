@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+from battery_symbols.config import CODEPOINTS_FILE
+from battery_symbols.output import write_if_changed
+from battery_symbols.runtime import (
+    LEVELS,
+    STYLE_NAMES,
+    codepoint,
+    format_glyph_name,
+)
+
+INDEX_VERSION = 1
+# New glyphs are numbered on from BASE_CODEPOINT through Supplementary Private
+# Use Area-A, then Area-B.
+PRIVATE_USE_AREAS = (range(0xF0000, 0xFFFFE), range(0x100000, 0x10FFFE))
+
+
+def default_codepoints() -> dict[str, int]:
+    """
+    Get the codepoints ``runtime.codepoint`` computes for the default glyphs.
+    """
+    return {
+        format_glyph_name(style, charging, level): codepoint(style, charging, level)
+        for style in STYLE_NAMES
+        for charging in (True, False)
+        for level in LEVELS
+    }
+
+
+def _next_codepoint(after: int) -> int:
+    for area in PRIVATE_USE_AREAS:
+        if after + 1 in area:
+            return after + 1
+        if after < area.start:
+            return area.start
+    raise ValueError("Ran out of private use codepoints for new glyphs.")
+
+
+class CodepointIndex:
+    """
+    Records the codepoint of every glyph that has been built, so a glyph keeps
+    its codepoint when the build matrix changes.
+
+    The default glyphs are always at the codepoints ``runtime.codepoint``
+    computes, whether they are built or not.  Any other glyph gets the
+    codepoint after the highest one handed out so far the first time it's
+    built, and keeps it from then on.  Codepoints of glyphs that are no longer
+    built are never handed out again.
+
+    A missing index file counts as empty, but one that can't be read is an
+    error rather than a reason to start over, since handing out fresh
+    codepoints would move every glyph that was already built.
+
+    Raises:
+        ValueError: If the index file isn't valid JSON or has another
+            version.
+    """
+
+    def __init__(self, path: Optional[Path] = CODEPOINTS_FILE):
+        self.path = path
+        self.glyphs = default_codepoints()
+        if path is None:
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as error:
+            raise ValueError(
+                f"{path} isn't a valid codepoint index: {error}"
+            ) from error
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} isn't a version {INDEX_VERSION} codepoint index.")
+        self.glyphs.update(data.get("glyphs", {}))
+
+    def allocate(self, names: list[str]) -> list[int]:
+        """
+        Get the codepoint of each glyph, handing out new ones as needed.
+
+        Raises:
+            ValueError: If the private use areas are full.
+        """
+        last = max(self.glyphs.values())
+        codepoints = []
+        for name in names:
+            if name not in self.glyphs:
+                last = self.glyphs[name] = _next_codepoint(last)
+            codepoints.append(self.glyphs[name])
+        return codepoints
+
+    def save(self) -> bool:
+        """
+        Returns:
+            Whether the file was written, see ``write_if_changed``.
+        """
+        if self.path is None:
+            return False
+        data = json.dumps(
+            {"version": INDEX_VERSION, "glyphs": self.glyphs},
+            indent=1,
+            sort_keys=True,
+        )
+        return write_if_changed(self.path, data.encode())
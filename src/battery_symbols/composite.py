@@ -0,0 +1,109 @@
+from array import array
+from collections import defaultdict
+from hashlib import sha256
+from itertools import accumulate
+from typing import Any
+
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib.tables._g_l_y_f import Glyph, GlyphCoordinates, flagOnCurve
+from fontTools.ttLib.tables.ttProgram import Program
+
+PART_PREFIX = "part"
+
+# A contour as (points, on-curve flags), in font units.
+Contour = tuple[tuple[tuple[int, int], ...], tuple[int, ...]]
+
+
+def _contours(glyph: Glyph) -> list[Contour]:
+    """
+    Split a simple glyph into its contours.
+    """
+    contours = []
+    start = 0
+    coordinates = list(glyph.coordinates)
+    for end in glyph.endPtsOfContours:
+        points = tuple((int(x), int(y)) for x, y in coordinates[start : end + 1])
+        flags = tuple(flag & flagOnCurve for flag in glyph.flags[start : end + 1])
+        contours.append((points, flags))
+        start = end + 1
+    return contours
+
+
+def _simple_glyph(contours: list[Contour], x_offset: int, y_offset: int) -> Glyph:
+    """
+    Build a simple glyph from contours, moved back by the given offset.
+    """
+    glyph = Glyph()
+    glyph.numberOfContours = len(contours)
+    glyph.coordinates = GlyphCoordinates(
+        (x - x_offset, y - y_offset) for points, _ in contours for x, y in points
+    )
+    glyph.flags = array("B", (flag for _, flags in contours for flag in flags))
+    glyph.endPtsOfContours = [
+        end - 1 for end in accumulate(len(points) for points, _ in contours)
+    ]
+    glyph.program = Program()
+    glyph.program.fromBytecode(b"")
+    return glyph
+
+
+def share_outlines(
+    glyf: dict[str, Glyph], hmtx: dict[str, tuple[int, int]]
+) -> list[str]:
+    """
+    Rebuild glyphs as composites of shared component glyphs, in place.
+
+    Contours are grouped by the set of glyphs they appear in, so the case,
+    anode and bolt of a style end up in one component used by every level,
+    while each level's fill gets a component of its own (TrueType glyphs
+    can't mix contours and components).  Groups with the same outline, up to
+    a translation, are stored once.
+
+    Args:
+        glyf: The simple glyphs to rebuild, by name.  Composites are written
+            back into it, and the component glyphs are added.
+        hmtx: The horizontal metrics, by name.  Components are added with
+            zero advance width.
+
+    Returns:
+        The names of the component glyphs, to append to the glyph order.
+    """
+    glyph_contours = {
+        name: _contours(glyph)
+        for name, glyph in glyf.items()
+        if glyph.numberOfContours > 0
+    }
+    users: dict[Contour, set[str]] = defaultdict(set)
+    for name, contours in glyph_contours.items():
+        for contour in contours:
+            users[contour].add(name)
+
+    parts: dict[str, Any] = {}
+    part_names: dict[str, str] = {}  # outline digest -> part name
+    for name, contours in glyph_contours.items():
+        # Keep the contour order within each group so outlines match exactly.
+        groups: dict[frozenset[str], list[Contour]] = defaultdict(list)
+        for contour in contours:
+            groups[frozenset(users[contour])].append(contour)
+        if len(groups) == 1 and len(users[contours[0]]) == 1:
+            continue  # Nothing to share.
+
+        pen = TTGlyphPen(parts)
+        for group in groups.values():
+            x_offset = min(x for points, _ in group for x, _ in points)
+            y_offset = min(y for points, _ in group for _, y in points)
+            normalized = [
+                (tuple((x - x_offset, y - y_offset) for x, y in points), flags)
+                for points, flags in group
+            ]
+            digest = sha256(repr(normalized).encode()).hexdigest()
+            if digest not in part_names:
+                part_name = f"{PART_PREFIX}.{len(part_names) + 1:04}"
+                part_names[digest] = part_name
+                parts[part_name] = _simple_glyph(group, x_offset, y_offset)
+                hmtx[part_name] = (0, 0)
+            pen.addComponent(part_names[digest], (1, 0, 0, 1, x_offset, y_offset))
+        glyf[name] = pen.glyph()
+
+    glyf.update(parts)
+    return list(parts)
@@ -2,6 +2,13 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
+FONT_FILE = PROJECT_ROOT / "BatterySymbols-Regular.ttf"
+VARIABLE_FONT_FILE = PROJECT_ROOT / "BatterySymbols-Variable.ttf"
+README_FILE = PROJECT_ROOT / "README.md"
+# The codepoint of every glyph that has been built, so a glyph keeps its
+# codepoint when the build matrix changes.
+CODEPOINTS_FILE = PROJECT_ROOT / "codepoints.json"
+
 BUILD_DIR = PROJECT_ROOT / "build"
 EXAMPLES_DIR = PROJECT_ROOT / "examples"
 ASSETS_DIR = PROJECT_ROOT / "assets"
@@ -15,3 +22,19 @@ RAW_DISCHARGE_DIR = RAW_DIR / "discharging"
 PROCESSED_DIR = BUILD_DIR / "processed"
 PROCESSED_CHARGE_DIR = PROCESSED_DIR / "charging"
 PROCESSED_DISCHARGE_DIR = PROCESSED_DIR / "discharging"
+
+CACHE_DIR = BUILD_DIR / "cache"
+RASTER_DIR = BUILD_DIR / "raster"
+
+SAMPLE_STEP = 10  # save a sample SVG for every level that's a multiple of this
+RASTER_SIZES = (16, 32, 64)  # pixel sizes of the sprite atlases
+ATLAS_COLUMNS = 16  # glyphs per sprite atlas row
+WATCH_INTERVAL = 0.25  # seconds between checks for changed sources in watch mode
+# Decimal places kept in the glyph SVG coordinates.  The glyphs are scaled up
+# about 6x into font units and then rounded, so this is well below what
+# survives into the font.
+SVG_PRECISION = 3
+# Threads writing rendered SVGs to disk, and how many rendered SVGs may wait
+# for them before rendering pauses.
+WRITER_THREADS = 2
+WRITE_QUEUE_SIZE = 64
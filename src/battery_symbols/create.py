@@ -1,106 +1,439 @@
 import xml.etree.ElementTree as Et
+from argparse import ArgumentParser
+from collections.abc import Callable, Collection, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from hashlib import sha256
+from io import StringIO
 from pathlib import Path
-from re import compile
+from typing import Any, Optional
 
 from fontTools.fontBuilder import FontBuilder
-from fontTools.pens.basePen import BasePen
+from fontTools.pens.basePen import AbstractPen, BasePen
 from fontTools.pens.boundsPen import BoundsPen
+from fontTools.pens.recordingPen import RecordingPen
 from fontTools.pens.svgPathPen import SVGPathPen
 from fontTools.pens.transformPen import TransformPen
 from fontTools.pens.ttGlyphPen import TTGlyphPen
 from fontTools.svgLib.path import SVGPath
 from fontTools.ttLib import TTFont
-from mistletoe import Document
-from mistletoe.block_token import Heading
+from fontTools.ttLib.tables._g_l_y_f import Glyph
+from mistletoe.block_token import Document, Heading
 from mistletoe.markdown_renderer import MarkdownRenderer
 from mistletoe.span_token import RawText
 from svgwrite import Drawing
 
+from battery_symbols.args import (
+    add_matrix_arguments,
+    matrix_from_args,
+    positive_int,
+)
+from battery_symbols.codepoints import CodepointIndex
+from battery_symbols.composite import share_outlines
 from battery_symbols.config import (
-    PROJECT_ROOT,
     EXAMPLES_DIR,
+    FONT_FILE,
+    FONTS_DIR,
     RAW_DIR,
+    README_FILE,
+    SAMPLE_STEP,
+    SVG_PRECISION,
+    VARIABLE_FONT_FILE,
+)
+from battery_symbols.generate import (
+    BUILD_MATRIX,
+    BuildMatrix,
+    GlyphJob,
+    glyph_entry,
+    glyph_jobs,
+    glyph_name,
+    glyph_path,
+    make_battery,
+)
+from battery_symbols.models import Battery
+from battery_symbols.output import OutputReport, save_font, write_if_changed
+from battery_symbols.profiling import (
+    StageProfiler,
+    add_profile_arguments,
+    profiler_from_args,
 )
+from battery_symbols.store import STORE_NAME, GlyphStore
+from battery_symbols.svgwriter import fill_path
+from battery_symbols.runtime import (
+    CASE_WIDTH,
+    STYLE_NAMES,
+    parse_glyph_name,
+)
+from battery_symbols.ttglyph import QuadraticOutline
+from battery_symbols.webfont import write_subset_web_fonts, write_web_fonts
 
 EM_SIZE = 1000  # units per em
+MAX_GLYPHS = 0x10000  # glyph IDs are 16 bit
 # ADV_WIDTH = 600  # default advance‐width
 ADV_WIDTH = 900
 LSB = 50  # default left‐side bearing
-BASE_CODEPOINT = 0xF2000  # starting codepoint
 
+# Draws a glyph outline into a pen and returns the horizontal space left over.
+GlyphDrawer = Callable[[AbstractPen], int | float]
+# Builds a glyph and returns it with its horizontal metrics.
+GlyphMaker = Callable[[], tuple[Glyph, tuple[int, int]]]
+
+
+ViewBox = tuple[int | float, int | float, int | float, int | float]
+
+
+class Outline:
+    """
+    A glyph outline recorded once, with the viewbox it's drawn in, that can
+    be replayed into any number of pens.
+    """
+
+    def __init__(self, viewbox: ViewBox, recording: RecordingPen):
+        self.viewbox = viewbox
+        self.recording = recording
+
+    @classmethod
+    def from_recording(cls, recording: RecordingPen, fallback: ViewBox) -> "Outline":
+        """
+        Use the bounds of the recorded outline as the viewbox, or ``fallback``
+        when there's nothing to measure.
+        """
+        pen = BoundsPen(None)
+        recording.replay(pen)
+        if pen.bounds:
+            x0, y0, x1, y1 = pen.bounds
+            return cls((x0, y0, x1 - x0, y1 - y0), recording)
+        return cls(fallback, recording)
+
+    def draw(self, pen: AbstractPen) -> None:
+        self.recording.replay(pen)
+
+
+def _parse_svg(root: Et.Element) -> Outline:
+    svg = SVGPath()
+    svg.root = root
+    recording = RecordingPen()
+    svg.draw(recording)
 
-def get_viewbox(
-    svg_file: Path,
-) -> tuple[int | float, int | float, int | float, int | float]:
-    root = Et.parse(svg_file).getroot()
     vb = root.attrib.get("viewBox", None)
     if vb:
         x0, y0, w, h = map(float, vb.split())
-        return x0, y0, w, h
-    pen = BoundsPen(None)
-    SVGPath(str(svg_file)).draw(pen)
-    if pen.bounds:
-        x0, y0, x1, y1 = pen.bounds
-        w = x1 - x0
-        h = y1 - y0
-        return x0, y0, w, h
+        return Outline((x0, y0, w, h), recording)
     # fallback: hardcode or measure via a pen
-    return 0, 0, 142, 66
+    return Outline.from_recording(recording, (0, 0, 142, 66))
 
 
-def draw_scaled(
-    svg_file: Path, pen: BasePen | TTGlyphPen, margin: float = 0.9
-) -> int | float:
-    x0, y0, w, h = get_viewbox(svg_file)
+@lru_cache(maxsize=4096)
+def _load_svg(svg_file: Path, mtime_ns: int, size: int) -> Outline:
+    return _parse_svg(Et.parse(svg_file).getroot())
+
+
+def parse_svg(data: bytes) -> Outline:
+    """
+    Parse an SVG document into a replayable outline, see ``load_svg``.
+    """
+    return _parse_svg(Et.fromstring(data))
+
+
+def load_svg(svg_file: Path) -> Outline:
+    """
+    Parse an SVG file exactly once into a replayable outline.
+
+    Outlines are cached, keyed on the file's modification time and size, so
+    asking again for an unchanged file doesn't touch the XML at all.
+
+    Args:
+        svg_file: The SVG to load.
+
+    Returns:
+        The SVG's viewbox (or outline bounds, without one) and its outline.
+    """
+    stat = svg_file.stat()
+    return _load_svg(svg_file, stat.st_mtime_ns, stat.st_size)
+
+
+def get_viewbox(
+    svg_file: Path,
+) -> ViewBox:
+    return load_svg(svg_file).viewbox
+
+
+def _scaled_transform(
+    viewbox: ViewBox,
+    margin: float,
+) -> tuple[tuple[float, float, float, float, float, float], int | float]:
+    """
+    Work out the transform that scales a viewbox into the em square, flipping
+    the y-axis and centering it horizontally.
+
+    :return: tuple of (affine transform, unused horizontal space)
+    """
+    x0, y0, w, h = viewbox
     scale = EM_SIZE * margin / max(w, h)
     glyph_width = w * scale
     extra_space: int | float = EM_SIZE - glyph_width
     tx = -x0 * scale + extra_space / 2
     ty = (h + y0) * scale
-    t_pen = TransformPen(pen, (scale, 0, 0, scale, tx, -ty))
-    SVGPath(str(svg_file)).draw(t_pen)
+    return (scale, 0, 0, scale, tx, -ty), extra_space
+
+
+def draw_outline_scaled(
+    outline: Outline, pen: AbstractPen, margin: float = 0.9
+) -> int | float:
+    """
+    Draw an outline into a pen, scaled into the em square and centered.
+
+    Returns:
+        The horizontal space left over in the em square.
+    """
+    transform, extra_space = _scaled_transform(outline.viewbox, margin)
+    outline.draw(TransformPen(pen, transform))
+    return extra_space
+
+
+def draw_scaled(
+    svg_file: Path, pen: BasePen | TTGlyphPen, margin: float = 0.9
+) -> int | float:
+    return draw_outline_scaled(load_svg(svg_file), pen, margin)
+
+
+def draw_stored_scaled(
+    store: GlyphStore, index: int, pen: BasePen | TTGlyphPen, margin: float = 0.9
+) -> int | float:
+    """
+    Draw a glyph from a glyph store, like ``draw_scaled`` does from a file.
+    """
+    return draw_outline_scaled(parse_svg(store.read(index)), pen, margin)
+
+
+def draw_battery_scaled(
+    battery: Battery, pen: AbstractPen, margin: float = 0.9
+) -> int | float:
+    """
+    Draw a battery model straight into a pen, with the same outline, scaling
+    and centering as ``draw_scaled`` gives its SVG, see ``battery_glyph``.
+
+    Args:
+        battery: The assembled battery to draw.
+        pen: The pen to draw into, usually a TTGlyphPen.
+        margin: Fraction of the em square the glyph may take up.
+
+    Returns:
+        The horizontal space left over in the em square.
+    """
+    glyph, extra_space = battery_glyph(battery, margin)
+    glyph.draw(pen, None)
     return extra_space
 
 
+def battery_glyph(
+    battery: Battery, margin: float = 0.9, precision: int = SVG_PRECISION
+) -> tuple[Glyph, int | float]:
+    """
+    Build a battery model's TrueType glyph straight from its skia paths, using
+    array operations instead of a pen call per segment (see ``ttglyph``).
+
+    The outline is the one ``draw_scaled`` reads back from the battery's SVG,
+    with its coordinates rounded to ``precision`` decimal places, so the glyph
+    comes out the same as it does from the SVG.
+
+    Args:
+        battery: The assembled battery to convert.
+        margin: Fraction of the em square the glyph may take up.
+        precision: Decimal places the SVG would keep, see ``svgwriter``.
+
+    Returns:
+        tuple of (glyph, unused horizontal space in the em square)
+    """
+    outline = QuadraticOutline.from_paths(
+        (fill_path(shape, paint) for shape, paint in battery.elements), precision
+    )
+    if outline.bounds:
+        x0, y0, x1, y1 = outline.bounds
+        viewbox: ViewBox = (x0, y0, x1 - x0, y1 - y0)
+    else:
+        viewbox = (0, 0, battery.svg_width, battery.svg_height)
+    transform, extra_space = _scaled_transform(viewbox, margin)
+    return outline.glyph(transform), extra_space
+
+
 def gather_svgs(raw_dir: Path) -> list[Path]:
     svg_paths = sorted(raw_dir.glob("**/*.svg"))
     return svg_paths
 
 
 def build_font(
-    svg_paths: list[Path], starting_codepoint: int, output_file: Path
+    svg_paths: list[Path],
+    output_file: Path,
+    profiler: Optional[StageProfiler] = None,
+    composite: bool = False,
+    codepoints: Optional[CodepointIndex] = None,
+    report: Optional[OutputReport] = None,
 ) -> None:
     """Create and save the TTF with each SVG mapped to a codepoint."""
     # glyph names from filenames
-    names = [p.stem for p in svg_paths]
-    # codepoints sequence
-    codepoints = [starting_codepoint + i for i in range(len(svg_paths))]
+    glyphs: list[tuple[str, GlyphMaker]] = [
+        (svg.stem, partial(draw_glyph, partial(draw_scaled, svg))) for svg in svg_paths
+    ]
+    _build_font(glyphs, output_file, profiler, composite, codepoints, report)
+
+
+def build_font_from_store(
+    store_file: Path,
+    output_file: Path,
+    profiler: Optional[StageProfiler] = None,
+    composite: bool = False,
+    codepoints: Optional[CodepointIndex] = None,
+    report: Optional[OutputReport] = None,
+    names: Optional[list[str]] = None,
+) -> None:
+    """
+    Create and save the TTF from the SVGs in a glyph store (see ``store``),
+    which is memory-mapped rather than opened glyph by glyph.
+
+    Args:
+        store_file: The glyph store to read.
+        output_file: Where to save the font.
+        profiler: Times each stage.
+        composite: Store shared outlines once, see ``_build_font``.
+        codepoints: The codepoint index, see ``_build_font``.
+        report: Records whether the font was written.
+        names: The entries to build, in order (default: all of them).
+
+    Raises:
+        KeyError: If one of ``names`` isn't in the store.
+    """
+    with GlyphStore(store_file) as store:
+        if names is None:
+            indices: Iterable[int] = range(len(store))
+        else:
+            indices = [store.position(name) for name in names]
+        glyphs: list[tuple[str, GlyphMaker]] = [
+            (
+                Path(store.names[index]).stem,
+                partial(draw_glyph, partial(draw_stored_scaled, store, index)),
+            )
+            for index in indices
+        ]
+        _build_font(glyphs, output_file, profiler, composite, codepoints, report)
+
+
+def _job_glyph(job: GlyphJob, font_path: Path) -> tuple[Glyph, tuple[int, int]]:
+    glyph, extra_space = battery_glyph(make_battery(job, font_path))
+    return glyph, (ADV_WIDTH, round(extra_space / 2))
+
+
+def build_font_from_models(
+    output_file: Path,
+    font_path: Path = FONTS_DIR / "OpenSans-Variable.ttf",
+    profiler: Optional[StageProfiler] = None,
+    composite: bool = False,
+    codepoints: Optional[CodepointIndex] = None,
+    matrix: BuildMatrix = BUILD_MATRIX,
+    report: Optional[OutputReport] = None,
+) -> None:
+    """
+    Create and save the TTF by drawing each battery model of ``matrix``
+    directly, skipping the SVG files entirely.
+    """
+    glyphs: list[tuple[str, GlyphMaker]] = [
+        (glyph_name(job), partial(_job_glyph, job, font_path))
+        for job in glyph_jobs(matrix)
+    ]
+    _build_font(glyphs, output_file, profiler, composite, codepoints, report)
+
+
+def draw_glyph(draw: GlyphDrawer) -> tuple[Glyph, tuple[int, int]]:
+    """
+    Draw a glyph into a TrueType glyph.
+
+    Returns:
+        tuple of (glyph, horizontal metrics)
+    """
+    tt_pen = TTGlyphPen(None)
+    # quad_pen = Cu2QuPen(tt_pen, max_err=1.0, all_quadratic=True)
+    # extra_space = draw(quad_pen)
+    extra_space = draw(tt_pen)
+    # hmtx = (ADV_WIDTH, 0)
+    return tt_pen.glyph(), (ADV_WIDTH, round(extra_space / 2))
+
+
+def _check_glyph_count(glyph_order: list[str]) -> None:
+    if len(glyph_order) > MAX_GLYPHS:
+        raise ValueError(
+            f"{len(glyph_order)} glyphs don't fit in a font, the limit is {MAX_GLYPHS}."
+        )
+
+
+def _build_font(
+    glyphs: list[tuple[str, GlyphMaker]],
+    output_file: Path,
+    profiler: Optional[StageProfiler] = None,
+    composite: bool = False,
+    codepoints: Optional[CodepointIndex] = None,
+    report: Optional[OutputReport] = None,
+) -> None:
+    """
+    Create and save the TTF, drawing each named glyph in order.  Codepoints
+    come from ``codepoints`` (the project's index by default), which is saved
+    with any new glyphs added once the font is written.  With ``composite``
+    set, outlines shared between glyphs are stored once as component glyphs
+    (see ``share_outlines``).  Neither file is written if it's unchanged.
+
+    Raises:
+        ValueError: If there are more glyphs than a font can hold.
+    """
+    profiler = profiler or StageProfiler()
+    report = report or OutputReport()
+    codepoint_index = codepoints or CodepointIndex()
+    names = [name for name, _ in glyphs]
 
     # prepare FontBuilder
     fb = FontBuilder(EM_SIZE, isTTF=True)
     glyph_order = [".notdef"] + names
-    fb.setupGlyphOrder(glyph_order)
+    _check_glyph_count(glyph_order)
 
-    # draw each glyph and set metrics & cmap
+    # draw each glyph and set metrics
     glyf = {}
     hmtx = {}
-    cmap = {}
 
     # .notdef (empty glyph)
     glyf[".notdef"] = TTGlyphPen(None).glyph()
     hmtx[".notdef"] = (ADV_WIDTH, LSB)
 
-    for cp, name, svg in zip(codepoints, names, svg_paths, strict=False):
-        tt_pen = TTGlyphPen(None)
-        # quad_pen = Cu2QuPen(tt_pen, max_err=1.0, all_quadratic=True)
-        # extra_space = draw_scaled(svg, quad_pen)
-        extra_space = draw_scaled(svg, tt_pen)
-        # SVGPath(str(svg)).draw(quad_pen)
-        glyf[name] = tt_pen.glyph()
-        hmtx[name] = (ADV_WIDTH, int(extra_space / 2))
-        # hmtx[name] = (ADV_WIDTH, 0)
-        cmap[cp] = name
-
+    with profiler.stage("codepoints", len(glyphs)):
+        cmap = dict(zip(codepoint_index.allocate(names), names, strict=True))
+
+    with profiler.stage("draw_glyphs", len(glyphs)):
+        for name, make_glyph in glyphs:
+            glyf[name], hmtx[name] = make_glyph()
+
+    if composite:
+        with profiler.stage("share_outlines", len(glyphs)) as timing:
+            part_names = share_outlines(glyf, hmtx)
+            timing.items = len(part_names)
+        glyph_order += part_names
+        _check_glyph_count(glyph_order)
+
+    with profiler.stage("assemble_tables", len(glyphs)):
+        fb.setupGlyphOrder(glyph_order)
+        setup_tables(fb, glyf, hmtx, cmap)
+
+    with profiler.stage("serialize_font", len(glyphs)):
+        written = save_font(fb.font, output_file)
+    report.record(output_file, written, verbose=True)
+    if codepoint_index.path is not None:
+        report.record(codepoint_index.path, codepoint_index.save(), verbose=True)
+
+
+def setup_tables(
+    fb: FontBuilder,
+    glyf: dict[str, Any],
+    hmtx: dict[str, tuple[int, int]],
+    cmap: dict[int, str],
+    font_name: str = "BatterySymbols-Regular",
+    style_name: str = "Regular",
+) -> None:
     fb.setupGlyf(glyf)
     fb.setupHorizontalMetrics(hmtx)
     fb.setupHorizontalHeader(
@@ -110,11 +443,11 @@ def build_font(
     namestrings = {
         "copyright": "Copyright (c) 2025 Chris Waltrip",
         "familyName": "Battery Symbols",
-        "styleName": "Regular",
-        "uniqueFontIdentifier": "BatterySymbols-Regular",
-        "fullName": "BatterySymbols-Regular",
+        "styleName": style_name,
+        "uniqueFontIdentifier": font_name,
+        "fullName": font_name,
         "version": "1.0",
-        "psName": "BatterySymbols-Regular",
+        "psName": font_name,
     }
 
     # basic tables
@@ -128,97 +461,195 @@ def build_font(
     fb.setupHead()
     fb.setupPost()
 
-    # ensure output dir exists
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    fb.save(str(output_file))
-    print(f"Wrote {output_file}.")
 
+# (position in glyph order, battery style, "charge"/"discharge", level percent)
+GlyphNameInfo = tuple[int, str, str, int | float]
+
+
+def _battery_name(style: str, width: int) -> str:
+    """The style name, suffixed with the case width if it isn't the default."""
+    return style if width == CASE_WIDTH else f"{style}_w{width}"
 
-def extract_and_save_sample_glyphs(font_path: Path, output_path: Path) -> list[str]:
+
+def index_glyph_names(glyph_order: list[str]) -> dict[str, GlyphNameInfo]:
+    """
+    Parse every battery glyph name in a single pass.
+
+    Args:
+        glyph_order: The font's glyph order.
+
+    Returns:
+        Each battery glyph's name mapped to its position, style, state and
+        level in percent.  Glyphs that don't follow the naming scheme are left
+        out, and glyphs at another case width count as a style of their own.
+    """
+    index: dict[str, GlyphNameInfo] = {}
+    for position, name in enumerate(glyph_order):
+        parsed = parse_glyph_name(name)
+        if parsed is None:
+            continue
+        style, width, state, level = parsed
+        index[name] = (position, _battery_name(style, width), state, level)
+    return index
+
+
+def _save_sample_svg(filename: Path, viewbox: str, path: str) -> bool:
+    drawing = Drawing(str(filename), viewBox=viewbox, debug=False)
+    drawing.add(drawing.path(d=path))
+    svg = StringIO()
+    drawing.write(svg)
+    # End with a newline like the checked-in samples do (see end-of-file-fixer
+    # in .pre-commit-config.yaml), so unchanged ones aren't rewritten.
+    svg.write("\n")
+    return write_if_changed(filename, svg.getvalue().encode("utf-8"))
+
+
+def extract_and_save_sample_glyphs(
+    font_path: Path,
+    output_path: Path,
+    sample_step: int = SAMPLE_STEP,
+    workers: Optional[int] = None,
+    names: Optional[Collection[str]] = None,
+    report: Optional[OutputReport] = None,
+) -> list[str]:
     """
-    Extract sample glyphs from the font we've created.  Probably good to have
-    the charged and discharged glyphs for charge_level % 10 == 0.  We know
-    the order of the glyphs, so given the starting codepoint we can grab those.
-    :return:
-    List of glyphs that can be converted to SVGs.
+    Extract sample glyphs from the font we've created: the charged and
+    discharged glyphs for every level that's a multiple of ``sample_step``.
+
+    Outlines are pulled from the font on the calling thread, and the SVG
+    serialization is handed to a pool of worker threads.
+
+    Args:
+        font_path: The font to extract from.
+        output_path: The directory to write the sample SVGs to.
+        sample_step: Keep every level that's a multiple of this.
+        workers: Number of writer threads, ``None`` lets the pool decide.
+        names: Only save the samples of these glyphs, all of them if None.
+        report: Records which samples were written and which were unchanged.
+
+    Returns:
+        The battery style names, in the order they appear in the font.
+
+    Raises:
+        ValueError: If ``sample_step`` isn't positive.
     """
+    if sample_step <= 0:
+        raise ValueError(f"The sample step must be positive, got {sample_step}")
 
+    report = report or OutputReport()
     font = TTFont(str(font_path))
     glyph_set = font.getGlyphSet()
-    glyph_order = font.getGlyphOrder()
-    battery_name_dict: dict[str, int] = {}
+    glyf_table = glyph_set.glyfTable
+    index = index_glyph_names(font.getGlyphOrder())
 
-    pattern = compile(r"_(\d{3})$")
-    battery_name_pattern = compile(r"battery_([^_]+)_(charge|discharge)_(\d{3})$")
-
-    for name in glyph_order:
-        match = pattern.search(name)
-        if not match:
-            continue
-        percent = int(match.group(1))
-        if percent % 10:
-            continue
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for name, (_position, _battery_name, _state, level) in index.items():
+            if level % sample_step or (names is not None and name not in names):
+                continue
 
-        try:
-            # glyph = glyph_set[name]
-            glyph = glyph_set.glyfTable.glyphs[name]
-            position = glyph_order.index(name)
             try:
-                battery_name = battery_name_pattern.search(name).group(1)  # type: ignore
-            except AttributeError:
-                print(f"Glyph {name} does not match expected pattern.")
+                glyph = glyf_table[name]
+            except KeyError:
+                print(f"Glyph {name} not found in glyfTable.")
                 continue
-            if battery_name not in battery_name_dict.keys():
-                battery_name_dict[battery_name] = position
 
-            if battery_name_dict[battery_name] > position:
-                battery_name_dict[battery_name] = position
-        except KeyError:
-            print(f"Glyph {name} not found in glyfTable.")
-            continue
+            pen = SVGPathPen(glyph_set)
+            glyph.draw(pen, glyf_table)
+
+            x_min, y_min, x_max, y_max = glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax
+            width = x_max - x_min
+            height = y_max - y_min
+
+            sample_file = output_path / f"{name}.svg"
+            futures.append(
+                (
+                    sample_file,
+                    executor.submit(
+                        _save_sample_svg,
+                        sample_file,
+                        f"{x_min} {y_min} {width} {height}",
+                        pen.getCommands(),
+                    ),
+                )
+            )
+        for sample_file, future in futures:
+            report.record(sample_file, future.result())
 
-        pen = SVGPathPen(glyph_set)
-        glyph.draw(pen, glyph_set.glyfTable)
+    return battery_style_names(index)
 
-        x_min, y_min, x_max, y_max = glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax
-        width = x_max - x_min
-        height = y_max - y_min
 
-        path = pen.getCommands()
+def battery_style_names(index: dict[str, GlyphNameInfo]) -> list[str]:
+    """
+    Get the battery style names from an index of glyph names.
 
-        filename = output_path / f"{name}.svg"
-        drawing = Drawing(str(filename), viewBox=f"{x_min} {y_min} {width} {height}")
-        drawing.add(drawing.path(d=path))
-        drawing.save()
+    Args:
+        index: The result of ``index_glyph_names``.
 
+    Returns:
+        The style names, in the order they first appear in the font.
+    """
+    battery_name_dict: dict[str, int] = {}
+    for position, battery_name, _state, _level in index.values():
+        battery_name_dict.setdefault(battery_name, position)
     return sorted(battery_name_dict, key=battery_name_dict.__getitem__)
 
 
+def read_battery_style_names(font_path: Path) -> list[str]:
+    """
+    Get the battery style names of an existing font, without loading its
+    outlines.
+    """
+    with TTFont(str(font_path), lazy=True) as font:
+        return battery_style_names(index_glyph_names(font.getGlyphOrder()))
+
+
+# (battery style, "charge"/"discharge", level percent)
+ExampleKey = tuple[str, str, int | float]
+
+
+def index_examples(examples_path: Path, readme_dir: Path) -> dict[ExampleKey, Path]:
+    """
+    Find every sample SVG in a single pass.
+
+    Args:
+        examples_path: The directory the samples are saved in.
+        readme_dir: The directory the sample paths are made relative to.
+
+    Returns:
+        Each sample's battery style, state and level mapped to its path.
+        Files that don't follow the naming scheme are left out.
+    """
+    index: dict[ExampleKey, Path] = {}
+    for file_ in sorted(examples_path.glob("**/*.svg")):
+        parsed = parse_glyph_name(file_.stem)
+        if parsed is None:
+            continue
+        style, width, state, level = parsed
+        index[_battery_name(style, width), state, level] = file_.relative_to(readme_dir)
+    return index
+
+
 def write_cheatsheet(
-    examples_path: Path, readme_dir: Path, battery_list: list[str]
+    examples_path: Path,
+    readme_dir: Path,
+    battery_list: list[str],
+    index: Optional[dict[ExampleKey, Path]] = None,
 ) -> list[tuple[str, str]]:
     result: list[tuple[str, str]] = []
     width_px = 60  # tweak to taste
-    for battery_name in battery_list:
-        files: dict[int, dict[str, Path]] = {}
-        pattern = compile(
-            r"battery_" + battery_name + r"_(charge|discharge)_(\d{3})\.svg$"
-        )  # noqa: E501
-
-        filelist = sorted(examples_path.glob("**/*.svg"))
-        for file_ in filelist:
-            match = pattern.match(file_.name)
-            if not match:
-                continue
-            kind, num_str = match.groups()  # e.g. kind="charge", num_str="010"
-            pct = int(num_str)  # 10
-            files.setdefault(pct, {})[kind] = file_.relative_to(readme_dir)
-        files = {k: files[k] for k in sorted(files)}
 
+    if index is None:
+        index = index_examples(examples_path, readme_dir)
+    levels: dict[str, set[int | float]] = {}
+    for battery_name, _state, level in index:
+        levels.setdefault(battery_name, set()).add(level)
+
+    for battery_name in battery_list:
         lines = []
 
         # 1) header row
-        pct_list = sorted(files)
+        pct_list = sorted(levels.get(battery_name, ()))
         header = "| " + " | ".join(f"{p}%" for p in pct_list) + " |"
         lines.append(header)
 
@@ -229,10 +660,11 @@ def write_cheatsheet(
         # 3) content row
         cells = []
         for p in pct_list:
-            fn = files[p]
+            discharge = index[battery_name, "discharge", p]
+            charge = index[battery_name, "charge", p]
             cell = (
-                f'<img src="{fn["discharge"]}" width="{width_px}" alt="Discharge {p}%"><br>'
-                f'<img src="{fn["charge"]}"   width="{width_px}" alt="Charge {p}%">'
+                f'<img src="{discharge}" width="{width_px}" alt="Discharge {p}%"><br>'
+                f'<img src="{charge}"   width="{width_px}" alt="Charge {p}%">'
             )
             cells.append(cell)
 
@@ -245,15 +677,37 @@ def write_cheatsheet(
 def _get_section_heading(token: Heading) -> str:
     """Flatten a Heading node’s RawText children into a single string."""
     return "".join(
-        child.content for child in token.children if isinstance(child, RawText)
+        child.content for child in token.children or () if isinstance(child, RawText)
     )
 
 
+def _style_heading(battery_name: str) -> str:
+    """E.g. "Simple Style", or "Simple Style, Width 160" for ``simple_w160``."""
+    style, _, width = battery_name.partition("_w")
+    heading = f"{style.title()} Style"
+    return f"{heading}, Width {width}" if width else heading
+
+
+def _section_digest(renderer: MarkdownRenderer, tokens: list[Any]) -> str:
+    section = Document([])
+    section.children = tokens
+    return sha256(renderer.render(section).encode()).hexdigest()
+
+
 def replace_cheatsheet(
     readme_path: Path,
     new_content: list[tuple[str, str]],
     cheatsheet_heading: str = "Examples",
-) -> None:
+) -> bool:
+    """
+    Put the cheatsheet under its heading in the README.  The README is only
+    written when the rendered section differs from the one already there, so
+    a build that changes nothing leaves it untouched.  Other edits to the
+    README are only rendered back out along with a changed section.
+
+    Returns:
+        Whether the README was written.
+    """
     try:
         with open(readme_path) as f:
             doc = Document(f)
@@ -261,13 +715,14 @@ def replace_cheatsheet(
             #     rendered = renderer.render(doc)
     except FileNotFoundError:
         print(f"{readme_path} not found.")
-        return
+        return False
+    children = list(doc.children or [])
 
     capture = False
     capture_start = None
     capture_end = None
     heading_level = -1
-    for i, node in enumerate(doc.children):
+    for i, node in enumerate(children):
         if isinstance(node, Heading):
             heading = _get_section_heading(node)
             if heading == cheatsheet_heading:
@@ -282,42 +737,238 @@ def replace_cheatsheet(
                 break
 
     if capture_start is None:
-        return
+        return False
 
     final_content = ""
     for subheading, content in new_content:
         final_content += (
-            f"{'#' * (heading_level + 1)} {subheading.title()} Style\n{content}\n"
+            f"{'#' * (heading_level + 1)} {_style_heading(subheading)}\n{content}\n"
         )
 
     frag_doc = Document(final_content.splitlines(keepends=True))
-    new_tokens = frag_doc.children
+    new_tokens = list(frag_doc.children or [])
+    old_tokens = children[capture_start + 1 : capture_end]
+
+    with MarkdownRenderer() as renderer:
+        if _section_digest(renderer, old_tokens) == _section_digest(
+            renderer, new_tokens
+        ):
+            return False
+
+        new_readme = children[0 : capture_start + 1]
+        new_readme += new_tokens
 
-    new_readme = doc.children[0 : capture_start + 1]
-    new_readme += new_tokens
+        if capture_end is not None:
+            new_readme += children[capture_end:]
 
-    if capture_end is not None:
-        new_readme += doc.children[capture_end:]
+        doc.children = new_readme
+        rendered = renderer.render(doc)
 
-    doc.children = new_readme
+    return write_if_changed(readme_path, rendered.encode("utf-8"))
 
-    with open(readme_path, "w") as f:
-        with MarkdownRenderer() as renderer:
-            f.write(renderer.render(doc))
 
+def run_build(
+    output_font_file: Path = FONT_FILE,
+    from_models: bool = False,
+    profiler: Optional[StageProfiler] = None,
+    composite: bool = False,
+    matrix: BuildMatrix = BUILD_MATRIX,
+    report: Optional[OutputReport] = None,
+    packed: bool = False,
+    raw_dir: Path = RAW_DIR,
+) -> None:
+    """
+    Build the font with the glyphs of ``matrix``, from the SVGs generated
+    under ``raw_dir`` (or its glyph store, if ``packed``) or straight from the
+    models.
 
-def main() -> None:
-    output_font_file = PROJECT_ROOT / "BatterySymbols-Regular.ttf"
-    readme_file = PROJECT_ROOT / "README.md"
+    Raises:
+        FileNotFoundError: If glyphs of the matrix haven't been generated.
+    """
+    profiler = profiler or StageProfiler()
+    if from_models:
+        build_font_from_models(
+            output_font_file,
+            profiler=profiler,
+            composite=composite,
+            matrix=matrix,
+            report=report,
+        )
+    elif packed:
+        store_file = raw_dir / STORE_NAME
+        with profiler.stage("gather_svgs", len(matrix)):
+            names = [glyph_entry(job) for job in glyph_jobs(matrix)]
+            with GlyphStore(store_file) as store:
+                unstored = [name for name in names if name not in store]
+        if unstored:
+            raise FileNotFoundError(
+                f"{len(unstored)} glyphs are missing from {store_file}, e.g. {unstored[0]}; run generate --packed with the same matrix first."
+            )
+        build_font_from_store(
+            store_file,
+            output_font_file,
+            profiler,
+            composite,
+            report=report,
+            names=names,
+        )
+    else:
+        with profiler.stage("gather_svgs", len(matrix)):
+            svgs = [glyph_path(raw_dir, job) for job in glyph_jobs(matrix)]
+            missing = [svg for svg in svgs if not svg.exists()]
+        if missing:
+            raise FileNotFoundError(
+                f"{len(missing)} glyph SVGs are missing, e.g. {missing[0]}; run generate with the same matrix first."
+            )
+        build_font(svgs, output_font_file, profiler, composite, report=report)
 
-    EXAMPLES_DIR.mkdir(parents=True, exist_ok=True)
 
-    svgs = gather_svgs(RAW_DIR)
+def run_web_fonts(
+    font_file: Path = FONT_FILE,
+    web: bool = False,
+    subset_styles: Optional[list[str]] = None,
+    subset_step: Optional[int] = None,
+    profiler: Optional[StageProfiler] = None,
+    report: Optional[OutputReport] = None,
+) -> None:
+    """
+    Write the web font versions of the font that were asked for: WOFF and
+    WOFF2 copies with ``web``, and a subset when either subset option is set.
+    """
+    profiler = profiler or StageProfiler()
+    if web:
+        with profiler.stage("web_fonts"):
+            write_web_fonts(font_file, report)
+    if subset_styles or subset_step:
+        with profiler.stage("subset_web_fonts"):
+            write_subset_web_fonts(font_file, subset_styles, subset_step or 1, report)
+
+
+def run_samples(
+    font_file: Path = FONT_FILE,
+    sample_step: int = SAMPLE_STEP,
+    workers: Optional[int] = None,
+    profiler: Optional[StageProfiler] = None,
+    report: Optional[OutputReport] = None,
+    examples_dir: Path = EXAMPLES_DIR,
+) -> list[str]:
+    """
+    Save the sample SVGs from the font into the examples directory.
 
-    build_font(svgs, BASE_CODEPOINT, output_font_file)
-    battery_name_list = extract_and_save_sample_glyphs(output_font_file, EXAMPLES_DIR)
-    cheatsheet_content = write_cheatsheet(EXAMPLES_DIR, PROJECT_ROOT, battery_name_list)
-    replace_cheatsheet(readme_file, cheatsheet_content)
+    Returns:
+        The battery style names, in the order they appear in the font.
+    """
+    profiler = profiler or StageProfiler()
+    examples_dir.mkdir(parents=True, exist_ok=True)
+    with profiler.stage("samples"):
+        return extract_and_save_sample_glyphs(
+            font_file, examples_dir, sample_step, workers, report=report
+        )
+
+
+def run_cheatsheet(
+    battery_name_list: list[str],
+    readme_file: Path = README_FILE,
+    profiler: Optional[StageProfiler] = None,
+    report: Optional[OutputReport] = None,
+) -> None:
+    """
+    Rebuild the cheatsheet from the sample SVGs and put it in the README.
+    """
+    profiler = profiler or StageProfiler()
+    report = report or OutputReport()
+    with profiler.stage("cheatsheet") as timing:
+        index = index_examples(EXAMPLES_DIR, readme_file.parent)
+        timing.items = len(index)
+        cheatsheet_content = write_cheatsheet(
+            EXAMPLES_DIR, readme_file.parent, battery_name_list, index
+        )
+    with profiler.stage("readme"):
+        written = replace_cheatsheet(readme_file, cheatsheet_content)
+    report.record(readme_file, written, verbose=True)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(description="Build the font, samples and cheatsheet.")
+    parser.add_argument(
+        "--from-models",
+        action="store_true",
+        help="Draw the glyphs straight from the battery models instead of the SVGs in the build directory.",
+    )
+    parser.add_argument(
+        "--packed",
+        action="store_true",
+        help="Read the glyphs from the glyph store written by generate --packed.",
+    )
+    parser.add_argument(
+        "--composite",
+        action="store_true",
+        help="Store outlines shared between glyphs once, as composite glyph components.",
+    )
+    add_matrix_arguments(parser)
+    parser.add_argument(
+        "--variable",
+        action="store_true",
+        help=f"Also build {VARIABLE_FONT_FILE.name}: the simple discharging battery only, with a level axis.",
+    )
+    parser.add_argument(
+        "--web",
+        action="store_true",
+        help="Also write WOFF and WOFF2 copies of the font.",
+    )
+    parser.add_argument(
+        "--subset-styles",
+        nargs="+",
+        choices=STYLE_NAMES,
+        help="Also write a WOFF/WOFF2 subset with only these styles.",
+    )
+    parser.add_argument(
+        "--subset-step",
+        type=positive_int,
+        help="Also write a WOFF/WOFF2 subset with only the levels that are a multiple of this.",
+    )
+    parser.add_argument(
+        "--sample-step",
+        type=positive_int,
+        default=SAMPLE_STEP,
+        help=f"Save a sample SVG for every level that's a multiple of this (default: {SAMPLE_STEP}).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of threads used to write the sample SVGs.",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args)
+    report = OutputReport()
+
+    matrix = matrix_from_args(parser, args)
+    run_build(
+        FONT_FILE,
+        args.from_models,
+        profiler,
+        args.composite,
+        matrix,
+        report,
+        args.packed,
+    )
+    if args.variable:
+        # Imported here because the variable module builds on this one.
+        from battery_symbols.variable import build_variable_font
+
+        build_variable_font(VARIABLE_FONT_FILE, profiler=profiler, report=report)
+    run_web_fonts(
+        FONT_FILE, args.web, args.subset_styles, args.subset_step, profiler, report
+    )
+    battery_name_list = run_samples(
+        FONT_FILE, args.sample_step, args.workers, profiler, report
+    )
+    run_cheatsheet(battery_name_list, README_FILE, profiler, report)
+    print(report.summary())
+    profiler.write(args.profile_output)
 
 
 if __name__ == "__main__":
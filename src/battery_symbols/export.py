@@ -1,53 +1,209 @@
-from fontTools.ttLib import TTFont
+import csv
+import json
+from argparse import ArgumentParser
+from collections.abc import Callable
+from io import StringIO
 from pathlib import Path
-from battery_symbols.config import PROJECT_ROOT
+from typing import Optional
+from battery_symbols.config import CACHE_DIR, FONT_FILE
+from battery_symbols.hashing import file_digest
+from battery_symbols.output import write_if_changed
+from battery_symbols.profiling import (
+    StageProfiler,
+    add_profile_arguments,
+    profiler_from_args,
+)
+
+EXPORT_CACHE_VERSION = 1
 
 
 def extract_glyphs(font_path: Path) -> dict[str, int]:
     """
     Extract a character from the font by its codepoint.
 
+    Only the ``cmap`` and ``post`` tables are read; the glyph outlines are
+    never loaded.
+
     Args:
         font_path: The location of the font to extract from.
 
     Returns:
         The glyphs and their names as a list of tuples.
     """
-    font = TTFont(font_path)
-    cmap = font["cmap"].getBestCmap()
+    # Imported here so a cache hit never pays for loading fontTools.
+    from fontTools.ttLib import TTFont
+
+    with TTFont(font_path, lazy=True) as font:
+        cmap = font["cmap"].getBestCmap()
+
+        unsorted_glyphs = {
+            glyph_name: codepoint
+            for codepoint, glyph_name in cmap.items()
+            if glyph_name != ".notdef"
+        }
+        glyphs = {}
+
+        for glyph_name in font.getGlyphOrder():
+            if glyph_name == ".notdef":
+                continue
+            if glyph_name in unsorted_glyphs:
+                glyphs[glyph_name] = unsorted_glyphs[glyph_name]
+
+    return glyphs
+
+
+def cache_path(font_path: Path, cache_dir: Path = CACHE_DIR) -> Path:
+    """
+    Get the cache file for a font, keyed by the hash of its contents.
+    """
+    return cache_dir / f"glyphs-{file_digest(font_path)}.json"
+
+
+def load_glyphs(
+    font_path: Path, cache_dir: Optional[Path] = CACHE_DIR
+) -> dict[str, int]:
+    """
+    Get the glyph mapping of a font, from the cache if this exact font has
+    been read before.
 
-    unsorted_glyphs = {
-        glyph_name: codepoint
-        for codepoint, glyph_name in cmap.items()
-        if glyph_name != ".notdef"
-    }
-    glyphs = {}
+    Args:
+        font_path: The location of the font to extract from.
+        cache_dir: Where cached mappings are kept, or None to bypass the cache.
+
+    Returns:
+        The glyph names and their codepoints, in glyph order.
+    """
+    if cache_dir is None:
+        return extract_glyphs(font_path)
 
-    for glyph_name in font.glyphOrder:
-        if glyph_name == ".notdef":
-            continue
-        if glyph_name in unsorted_glyphs:
-            glyphs[glyph_name] = unsorted_glyphs[glyph_name]
+    cache_file = cache_path(font_path, cache_dir)
+    try:
+        with open(cache_file) as f:
+            data = json.load(f)
+        # Anything that isn't a cache this version wrote is a miss.
+        if isinstance(data, dict) and data.get("version") == EXPORT_CACHE_VERSION:
+            return dict(data["glyphs"])
+    except (FileNotFoundError, KeyError, TypeError, ValueError):
+        pass
 
+    glyphs = extract_glyphs(font_path)
+    data = json.dumps({"version": EXPORT_CACHE_VERSION, "glyphs": glyphs})
+    write_if_changed(cache_file, data.encode())
     return glyphs
 
 
-def print_output(glyphs: dict[str, int]) -> None:
+def format_print(glyphs: dict[str, int]) -> str:
+    return "".join(
+        f"i='{chr(glyph)}' i_bs_{name}=$i\n" for name, glyph in glyphs.items()
+    )
+
+
+def format_shell(glyphs: dict[str, int]) -> str:
+    """One ``i_bs_<name>='<char>'`` assignment per line, for sourcing."""
+    return "".join(f"i_bs_{name}='{chr(glyph)}'\n" for name, glyph in glyphs.items())
+
+
+def format_json(glyphs: dict[str, int]) -> str:
+    return (
+        json.dumps(
+            [
+                {"name": name, "codepoint": glyph, "char": chr(glyph)}
+                for name, glyph in glyphs.items()
+            ],
+            ensure_ascii=False,
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+def format_csv(glyphs: dict[str, int]) -> str:
+    output = StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["name", "codepoint", "char"])
+    for name, glyph in glyphs.items():
+        writer.writerow([name, f"U+{glyph:04X}", chr(glyph)])
+    return output.getvalue()
+
+
+FORMATS: dict[str, Callable[[dict[str, int]], str]] = {
+    "print": format_print,
+    "shell": format_shell,
+    "json": format_json,
+    "csv": format_csv,
+}
+
+
+def print_output(
+    glyphs: dict[str, int],
+    output_format: str = "print",
+    output_file: Optional[Path] = None,
+) -> None:
     """
     Print the codepoints and names of the glyphs.
 
     Args:
         glyphs: A dictionary of all glyph names and their respective codepoints.
+        output_format: One of the keys of ``FORMATS``.
+        output_file: Write here instead of printing to stdout.
     """
-    for name, glyph in glyphs.items():
-        print(f"i='{chr(glyph)}' i_bs_{name}=$i")
+    output = FORMATS[output_format](glyphs)
+    if output_file is None:
+        print(output, end="")
+    elif write_if_changed(output_file, output.encode("utf-8")):
+        print(f"Wrote {output_file}.")
+    else:
+        print(f"{output_file} is unchanged.")
+
+
+def run_export(
+    font_path: Path = FONT_FILE,
+    output_format: str = "print",
+    output_file: Optional[Path] = None,
+    use_cache: bool = True,
+    profiler: Optional[StageProfiler] = None,
+) -> None:
+    """
+    Read the glyph mapping of a font and print or save it.
+    """
+    profiler = profiler or StageProfiler()
+    with profiler.stage("read_font") as timing:
+        glyphs = load_glyphs(font_path, CACHE_DIR if use_cache else None)
+        timing.items = len(glyphs)
+
+    with profiler.stage("output", len(glyphs)):
+        print_output(glyphs, output_format, output_file)
 
 
-def main() -> None:
-    font = PROJECT_ROOT / "BatterySymbols-Regular.ttf"
-    glyphs = extract_glyphs(font)
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(description="Print the glyph names and characters.")
+    parser.add_argument(
+        "--font",
+        type=Path,
+        default=FONT_FILE,
+        help="The font to read (default: the font in the project root).",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        default="print",
+        help="Output format (default: print).",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Write to this file instead of stdout."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always read the font instead of using the cached mapping.",
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args)
 
-    print_output(glyphs)
+    run_export(args.font, args.format, args.output, not args.no_cache, profiler)
+    profiler.write(args.profile_output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+from functools import cache
+from pathlib import Path
+from typing import Optional
+
+import skia
+
+# Process-wide caches for the fonts used to render text into the batteries.
+# Every NumberBattery uses the same typeface at the same size, so each
+# typeface is loaded once and each digit outline is built once.  Cached skia
+# objects are shared and must not be modified.
+
+
+@cache
+def load_typeface(font_path: Path) -> skia.Typeface:
+    """
+    Load a typeface from a font file.
+
+    Args:
+        font_path: The font file to load.
+
+    Returns:
+        The loaded typeface.
+
+    Raises:
+        RuntimeError: If skia can't load the font.
+    """
+    typeface = skia.Typeface.MakeFromFile(str(font_path))
+    if not typeface:
+        raise RuntimeError("Couldn't load font")
+    return typeface
+
+
+@cache
+def get_font(font_path: Path, size: float) -> skia.Font:
+    """
+    Get a font for a typeface at a given size.
+    """
+    return skia.Font(load_typeface(font_path), size)
+
+
+@cache
+def get_metrics(font_path: Path, size: float) -> skia.FontMetrics:
+    return get_font(font_path, size).getMetrics()
+
+
+@cache
+def text_to_glyphs(font_path: Path, size: float, text: str) -> tuple[int, ...]:
+    """
+    Convert text to the glyph ids of a font.
+    """
+    font = get_font(font_path, size)
+    return tuple(font.textToGlyphs(text, encoding=skia.TextEncoding.kUTF8))
+
+
+@cache
+def glyph_outline(
+    font_path: Path, size: float, glyph_id: int
+) -> tuple[Optional[skia.Path], float]:
+    """
+    Get the outline and advance width of a single glyph.
+
+    Args:
+        font_path: The font file the glyph belongs to.
+        size: The font size.
+        glyph_id: The glyph id within the font.
+
+    Returns:
+        tuple of (outline, or None for glyphs without one, advance width)
+    """
+    font = get_font(font_path, size)
+    return font.getPath(glyph_id), font.getWidths([glyph_id])[0]
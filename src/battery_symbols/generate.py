@@ -1,27 +1,437 @@
-from battery_symbols.models import SimpleBattery, NumberBattery
+import os
+from argparse import ArgumentParser
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+from battery_symbols.args import add_matrix_arguments, matrix_from_args
+from battery_symbols.cache import BuildManifest, glyph_key
+from battery_symbols.models import Battery, SimpleBattery, NumberBattery
+from battery_symbols.output import BackgroundWriter, OutputReport
+from battery_symbols.store import STORE_NAME, GlyphStore, StoreWriter, stored_names
+from battery_symbols.runtime import (
+    CASE_WIDTH,
+    LEVEL_STEPS,
+    format_glyph_name,
+    level_percent,
+)
+from battery_symbols.profiling import (
+    StageProfiler,
+    add_profile_arguments,
+    profiler_from_args,
+)
 from battery_symbols.config import (
     RAW_DIR,
     FONTS_DIR,
+    SVG_PRECISION,
+    WRITER_THREADS,
 )
 
+# Order matters: the style index is used for the output directory name and the
+# default glyphs' codepoints.  runtime.STYLE_NAMES must list the same names in
+# the same order.
+BATTERY_STYLES: list[tuple[type[Battery], str]] = [
+    (SimpleBattery, "simple"),
+    (NumberBattery, "number"),
+]
+
+MANIFEST_NAME = "manifest.json"
+# The glyph store has its own manifest, since it's updated independently of
+# the loose SVGs.
+STORE_MANIFEST_NAME = "manifest-packed.json"
+
+# (style index, charging, level, level steps, case width)
+GlyphJob = tuple[int, bool, int, int, int]
+
+
+class BuildMatrix:
+    """
+    Declares the glyphs that make up the font: every combination of style,
+    charge state, level and case width.
+
+    Args:
+        styles: The style indices into ``BATTERY_STYLES``, all of them if None.
+        states: The charge states, charging and discharging by default.
+        steps: Levels per full charge, a power of ten, e.g. 1000 for per-mille
+            levels.  Glyph names pad the level to a digit per power, so levels
+            at different steps never share a name.
+        widths: The case widths.
+
+    Raises:
+        ValueError: If the steps aren't a power of ten, or a style or width
+            doesn't exist.
+    """
+
+    def __init__(
+        self,
+        styles: Optional[Sequence[int]] = None,
+        states: Sequence[bool] = (True, False),
+        steps: int = LEVEL_STEPS,
+        widths: Sequence[int] = (CASE_WIDTH,),
+    ):
+        self.styles = tuple(range(len(BATTERY_STYLES)) if styles is None else styles)
+        self.states = tuple(states)
+        self.steps = steps
+        self.widths = tuple(widths)
+        if steps < 10 or str(steps).rstrip("0") != "1":
+            raise ValueError(f"Level steps must be a power of ten, got {steps}")
+        if not set(self.styles) <= set(range(len(BATTERY_STYLES))):
+            raise ValueError(f"Unknown style index in {self.styles}")
+        if min(self.widths, default=0) <= 0:
+            raise ValueError(f"Case widths must be positive, got {self.widths}")
+
+    def __len__(self) -> int:
+        return len(self.styles) * len(self.widths) * len(self.states) * (self.steps + 1)
+
+
+# The default glyphs: whole percent levels at the default case width.
+BUILD_MATRIX = BuildMatrix()
+
+
+def glyph_jobs(matrix: BuildMatrix = BUILD_MATRIX) -> list[GlyphJob]:
+    """
+    Enumerate every glyph of a build matrix.
+
+    Returns:
+        A list of (style index, charging, level, level steps, case width) jobs
+        in build order.
+    """
+    return [
+        (style_index, charge, level, matrix.steps, width)
+        for style_index in matrix.styles
+        for width in matrix.widths
+        for charge in matrix.states
+        for level in range(matrix.steps + 1)
+    ]
+
+
+def glyph_name(job: GlyphJob) -> str:
+    """
+    Get the glyph name for a job, e.g. ``battery_simple_charge_042``, see
+    ``runtime.format_glyph_name``.
+
+    Args:
+        job: The (style index, charging, level, level steps, case width) of
+            the glyph.
+
+    Returns:
+        The name used for both the SVG file stem and the font glyph.
+    """
+    style_index, charge, level, steps, width = job
+    return format_glyph_name(
+        BATTERY_STYLES[style_index][1], charge, level, steps, width
+    )
+
+
+def glyph_entry(job: GlyphJob) -> str:
+    """
+    Get the SVG location for a job relative to the raw output directory, which
+    is also its name in a glyph store.
+    """
+    return f"style_{job[0]}/{glyph_name(job)}.svg"
+
+
+def glyph_path(raw_dir: Path, job: GlyphJob) -> Path:
+    """
+    Get the SVG location for a job under the raw output directory.
+    """
+    return raw_dir / glyph_entry(job)
+
+
+def make_battery(job: GlyphJob, font_path: Path) -> Battery:
+    """
+    Construct the battery model for a job.
+
+    Args:
+        job: The (style index, charging, level, level steps, case width) of
+            the glyph.
+        font_path: The font used by styles that render text.
+
+    Returns:
+        The assembled battery, ready to be drawn.
+    """
+    style_index, charge, level, steps, width = job
+    battery_class = BATTERY_STYLES[style_index][0]
+    return battery_class(
+        width=width,
+        charging=charge,
+        level=level_percent(level, steps),
+        font_path=font_path,
+    )
+
+
+def render_glyph(
+    job: GlyphJob,
+    raw_dir: Path,
+    font_path: Path,
+    precision: int = SVG_PRECISION,
+    merge: bool = False,
+) -> tuple[Path, bytes]:
+    """
+    Render a single glyph to SVG, leaving the writing to the caller.
+
+    This is a module level function so it can be shipped to worker processes.
+
+    Args:
+        job: The (style index, charging, level, level steps, case width) of
+            the glyph.
+        raw_dir: The root directory the SVG belongs under.
+        font_path: The font used by styles that render text.
+        precision: Decimal places kept in the SVG coordinates.
+        merge: Render the glyph as a single merged path.
+
+    Returns:
+        tuple of (SVG path, SVG document).
+    """
+    svg = make_battery(job, font_path).render_svg(precision, merge)
+    return glyph_path(raw_dir, job), svg
+
+
+def job_key(
+    job: GlyphJob,
+    font_path: Path,
+    precision: int = SVG_PRECISION,
+    merge: bool = False,
+) -> str:
+    """
+    Get the cache key for a job, see ``cache.glyph_key``.
+    """
+    style_index, charge, level, steps, width = job
+    return glyph_key(
+        BATTERY_STYLES[style_index][0],
+        width,
+        charge,
+        level_percent(level, steps),
+        font_path,
+        precision,
+        merge,
+    )
+
+
+def _render_chunk(
+    render: Callable[[GlyphJob], tuple[Path, bytes]], jobs: list[GlyphJob]
+) -> list[tuple[Path, bytes]]:
+    return [render(job) for job in jobs]
+
+
+def _render(
+    jobs: list[GlyphJob],
+    raw_dir: Path,
+    font_path: Path,
+    workers: int,
+    precision: int,
+    merge: bool,
+) -> Iterator[tuple[Path, bytes]]:
+    render = partial(
+        render_glyph,
+        raw_dir=raw_dir,
+        font_path=font_path,
+        precision=precision,
+        merge=merge,
+    )
+    if workers == 1 or len(jobs) <= 1:
+        yield from map(render, jobs)
+        return
+
+    # Each glyph is independent, so hand out contiguous shards of the job list
+    # to keep the pickling overhead per glyph low.  Only a couple of shards per
+    # worker are in flight at a time, so while the caller is held back by its
+    # writers the workers stop too, instead of piling up rendered SVGs.
+    chunksize = max(1, len(jobs) // (workers * 4))
+    pending: deque[Future[list[tuple[Path, bytes]]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(jobs), chunksize):
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+            chunk = jobs[start : start + chunksize]
+            pending.append(executor.submit(_render_chunk, render, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _pack(
+    store_file: Path,
+    jobs: list[GlyphJob],
+    stale: set[GlyphJob],
+    rendered: Iterator[tuple[Path, bytes]],
+) -> bool:
+    """
+    Stream the glyph store to disk in job order, taking the stale glyphs from
+    ``rendered`` as they come out of ``_render`` (in the same order) and the
+    rest from the previous store.
+    """
+    try:
+        previous: Optional[GlyphStore] = GlyphStore(store_file)
+    except (FileNotFoundError, ValueError):
+        previous = None
+    # The previous store stays mapped until the new one is renamed over it.
+    try:
+        with StoreWriter(store_file, [glyph_entry(job) for job in jobs]) as writer:
+            for job in jobs:
+                if job in stale or previous is None:
+                    _output_file, svg = next(rendered)
+                else:
+                    svg = previous[glyph_entry(job)]
+                writer.add(svg)
+            return writer.commit()
+    finally:
+        if previous is not None:
+            previous.close()
+
+
+def generate(
+    raw_dir: Path = RAW_DIR,
+    font_path: Path = FONTS_DIR / "OpenSans-Variable.ttf",
+    workers: Optional[int] = None,
+    force: bool = False,
+    profiler: Optional[StageProfiler] = None,
+    precision: int = SVG_PRECISION,
+    merge: bool = False,
+    matrix: BuildMatrix = BUILD_MATRIX,
+    report: Optional[OutputReport] = None,
+    writers: int = WRITER_THREADS,
+    packed: bool = False,
+) -> list[Path]:
+    """
+    Render every glyph SVG, optionally sharded across a process pool.
+
+    Glyphs whose inputs are unchanged since the last run (according to the
+    manifest in ``raw_dir``) are skipped unless ``force`` is set.
+
+    Args:
+        raw_dir: The root directory to write the SVGs under.
+        font_path: The font used by styles that render text.
+        workers: Number of worker processes.  ``None`` uses the CPU count and
+            ``1`` renders in the current process.
+        force: Render every glyph, even if it is up to date.
+        profiler: Records how long each stage takes.
+        precision: Decimal places kept in the SVG coordinates.
+        merge: Write each glyph as a single merged path.
+        matrix: The glyphs to render.
+        report: Records which SVGs were written and which came out the same
+            as the file already there.
+        writers: Number of threads writing the SVGs while the next ones are
+            rendered.  ``0`` writes each one before rendering the next.
+        packed: Write the glyphs into a single glyph store in ``raw_dir``
+            (see ``store``) instead of loose SVGs.
+
+    Returns:
+        The paths of the SVGs that were rendered, in build order.  In a
+        packed build these are the paths they'd unpack to.
+    """
+    profiler = profiler or StageProfiler()
+    report = report or OutputReport()
+    jobs = glyph_jobs(matrix)
+    store_file = raw_dir / STORE_NAME
+    if not packed:
+        for style_index in matrix.styles:
+            (raw_dir / f"style_{style_index}").mkdir(parents=True, exist_ok=True)
+
+    with profiler.stage("plan", len(jobs)):
+        manifest = BuildManifest(
+            raw_dir / (STORE_MANIFEST_NAME if packed else MANIFEST_NAME)
+        )
+        keys = {job: job_key(job, font_path, precision, merge) for job in jobs}
+        stored = stored_names(store_file) if packed else None
+        stale = [
+            job
+            for job in jobs
+            if force
+            or not manifest.is_current(
+                glyph_path(raw_dir, job),
+                keys[job],
+                None if stored is None else glyph_entry(job) in stored,
+            )
+        ]
+
+    with profiler.stage("render", len(stale)):
+        rendered = _render(
+            stale,
+            raw_dir,
+            font_path,
+            workers or os.cpu_count() or 1,
+            precision,
+            merge,
+        )
+        if packed:
+            written = _pack(store_file, jobs, set(stale), rendered)
+            report.record(store_file, written)
+        else:
+            with BackgroundWriter(writers, report=report) as writer:
+                for output_file, svg in rendered:
+                    writer.submit(output_file, svg)
+
+    with profiler.stage("manifest"):
+        manifest.prune({glyph_path(raw_dir, job) for job in jobs})
+        for job in stale:
+            manifest.record(glyph_path(raw_dir, job), keys[job])
+        report.record(manifest.path, manifest.save())
+    return [glyph_path(raw_dir, job) for job in stale]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(description="Render the battery glyph SVGs.")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count, 1 disables the pool).",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Render every glyph, even ones that are unchanged since the last run.",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=SVG_PRECISION,
+        help=f"Decimal places kept in the SVG coordinates (default: {SVG_PRECISION}).",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Union each glyph's shapes into a single SVG path.",
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=WRITER_THREADS,
+        help=f"Number of threads writing the SVGs, 0 writes them in between renders (default: {WRITER_THREADS}).",
+    )
+    parser.add_argument(
+        "--packed",
+        action="store_true",
+        help="Write the glyphs into a single glyph store instead of loose SVGs.",
+    )
+    add_matrix_arguments(parser, "render")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args)
+    matrix = matrix_from_args(parser, args)
+    report = OutputReport()
 
-def main() -> None:
     RAW_DIR.mkdir(parents=True, exist_ok=True)
-    font_path = FONTS_DIR / "OpenSans-Variable.ttf"
-
-    batteries = [(SimpleBattery, "simple"), (NumberBattery, "number")]  # type: ignore
-    for battery_order_index, battery in enumerate(batteries):
-        for charge in [True, False]:
-            for i in range(101):
-                out_dir = RAW_DIR / f"style_{battery_order_index}"
-                out_dir.mkdir(parents=True, exist_ok=True)
-                glyph_name = f"battery_{battery[1]}_{'charge' if charge else 'discharge'}_{i:0>3}.svg"
-                glyph_path = out_dir / glyph_name
-
-                glyph = battery[0](
-                    width=120, charging=charge, level=i, font_path=font_path
-                )
-                glyph.build_svg(glyph_path)
+    rendered = generate(
+        RAW_DIR,
+        workers=args.workers,
+        force=args.force,
+        profiler=profiler,
+        precision=args.precision,
+        merge=args.merge,
+        matrix=matrix,
+        report=report,
+        writers=args.writers,
+        packed=args.packed,
+    )
+    print(f"Rendered {len(rendered)} of {len(matrix)} glyphs.")
+    print(report.summary())
+    profiler.write(args.profile_output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+from functools import cache
+from hashlib import sha256
+from pathlib import Path
+
+
+@cache
+def file_digest(path: Path) -> str:
+    """
+    Hash the contents of a file, once per process.
+
+    Args:
+        path: The file to hash.
+
+    Returns:
+        The hex SHA-256 digest of the file.
+    """
+    return read_digest(path)
+
+
+def read_digest(path: Path) -> str:
+    """
+    Hash the current contents of a file, for files that may have changed since
+    they were last hashed.
+    """
+    digest = sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,167 +1,22 @@
 from abc import ABC, abstractmethod
+from functools import cache
 from math import sqrt
+from pathlib import Path
 from typing import Optional
 
 import skia
 from svg import (
-    C,
-    H,
-    L,
-    M,
-    Path,
-    Q,
-    V,
     Z,
-    c,
     h,
     l,
-    m,
     q,
-    v,
-    PathData,
 )
 
-from battery_symbols.config import FONTS_DIR
-
-
-def _define_bounding_box(  # noqa: C901
-    coordinates: list[PathData],
-) -> tuple[int | float, int | float, int | float, int | float]:
-    """
-    Compute the bounding box of the given coordinates.
-    :return: tuple of (min_x, min_y, max_x, max_y)
-    """
-    x = y = 0.0
-    min_x = min_y = float("inf")
-    max_x = max_y = float("-inf")
-
-    for cmd in coordinates:
-        if isinstance(cmd, M):
-            # absolute MoveTo
-            x, y = cmd.x, cmd.y  # type: ignore
-        elif isinstance(cmd, m):
-            # relative moveto
-            x += cmd.dx  # type: ignore
-            y += cmd.dy  # type: ignore
-        elif isinstance(cmd, L):
-            # absolute LineTo
-            x, y = cmd.x, cmd.y  # type: ignore
-        elif isinstance(cmd, l):
-            # relative line to
-            x += cmd.dx  # type: ignore
-            y += cmd.dy  # type: ignore
-        elif isinstance(cmd, H):
-            # absolute horizontal line
-            x = cmd.x  # type: ignore
-        elif isinstance(cmd, h):
-            # relative horizontal line
-            x += cmd.dx  # type: ignore
-        elif isinstance(cmd, V):
-            # absolute vertical line
-            y = cmd.y  # type: ignore
-        elif isinstance(cmd, v):
-            # relative vertical line
-            y += cmd.dy  # type: ignore
-        elif isinstance(cmd, C):
-            # absolute cubic Bézier; .x,.y is endpoint
-            x, y = cmd.x, cmd.y  # type: ignore
-        elif isinstance(cmd, c):
-            # relative cubic Bézier; dx,dy is endpoint offset
-            x += cmd.dx  # type: ignore
-            y += cmd.dy  # type: ignore
-        elif isinstance(cmd, Q):
-            # absolute quadratic Bézier; .x,.y is endpoint
-            x, y = cmd.x, cmd.y
-        elif isinstance(cmd, q):
-            # relative quadratic Bézier; dx,dy is endpoint offset
-            x += cmd.dx
-            y += cmd.dy
-        elif isinstance(cmd, Z):
-            pass
-        else:
-            print(f"Got type I can't process: {type(cmd)}")
-            continue
-
-        # update our min/max
-        min_x = min(min_x, x)
-        max_x = max(max_x, x)
-        min_y = min(min_y, y)
-        max_y = max(max_y, y)
-
-    return min_x, min_y, max_x, max_y
-
-
-def _scale_path(  # noqa: C901
-    coordinates: list[PathData],
-    scale_x: float,
-    scale_y: float,
-    x_offset: float,
-    y_offset: float,
-) -> list[PathData]:
-    cmds: list[PathData] = []
-    for cmd in coordinates:
-        if isinstance(cmd, M):
-            cmds.append(M(cmd.x * scale_x + x_offset, cmd.y * scale_y + y_offset))  # type: ignore
-        elif isinstance(cmd, m):
-            cmds.append(m(cmd.dx * scale_x, cmd.dy * scale_y))  # type: ignore
-        elif isinstance(cmd, L):
-            cmds.append(L(cmd.x * scale_x + x_offset, cmd.y * scale_y + y_offset))  # type: ignore
-        elif isinstance(cmd, l):
-            cmds.append(l(cmd.dx * scale_x, cmd.dy * scale_y))  # type: ignore
-        elif isinstance(cmd, H):
-            cmds.append(H(cmd.x * scale_x + x_offset))  # type: ignore
-        elif isinstance(cmd, h):
-            cmds.append(h(cmd.dx * scale_x))  # type: ignore
-        elif isinstance(cmd, V):
-            cmds.append(V(cmd.y * scale_y + y_offset))  # type: ignore
-        elif isinstance(cmd, v):
-            cmds.append(v(cmd.dy * scale_y))  # type: ignore
-        elif isinstance(cmd, C):
-            cmds.append(
-                C(
-                    cmd.x1 * scale_x + x_offset,  # type: ignore
-                    cmd.y1 * scale_y + y_offset,  # type: ignore
-                    cmd.x2 * scale_x + x_offset,  # type: ignore
-                    cmd.y2 * scale_y + y_offset,  # type: ignore
-                    cmd.x * scale_x + x_offset,  # type: ignore
-                    cmd.y * scale_y + y_offset,  # type: ignore
-                )
-            )
-        elif isinstance(cmd, c):
-            cmds.append(
-                c(
-                    cmd.dx1 * scale_x,  # type: ignore
-                    cmd.dy1 * scale_y,  # type: ignore
-                    cmd.dx2 * scale_x,  # type: ignore
-                    cmd.dy2 * scale_y,  # type: ignore
-                    cmd.dx * scale_x,  # type: ignore
-                    cmd.dy * scale_y,  # type: ignore
-                )
-            )
-        elif isinstance(cmd, Q):
-            cmds.append(
-                Q(
-                    cmd.x1 * scale_x + x_offset,  # type: ignore
-                    cmd.y1 * scale_y + y_offset,  # type: ignore
-                    cmd.x * scale_x + x_offset,  # type: ignore
-                    cmd.y * scale_y + y_offset,  # type: ignore
-                )
-            )
-        elif isinstance(cmd, q):
-            cmds.append(
-                q(
-                    cmd.dx1 * scale_x,  # type: ignore
-                    cmd.dy1 * scale_y,  # type: ignore
-                    cmd.dx * scale_x,  # type: ignore
-                    cmd.dy * scale_y,  # type: ignore
-                )
-            )
-        elif isinstance(cmd, Z):
-            cmds.append(Z())
-        else:  # Z()
-            print(f"_scale_path_percentage: Got type I can't process: {type(cmd)}")
-
-    return cmds
+from battery_symbols.config import FONTS_DIR, SVG_PRECISION
+from battery_symbols.fonts import get_metrics, glyph_outline, text_to_glyphs
+from battery_symbols.paths import ArrayPath
+from battery_symbols.pens import as_path
+from battery_symbols.svgwriter import render_svg, write_svg
 
 
 def _path_and_mask(
@@ -235,7 +90,7 @@ class BatteryChargeLevel:
         self,
         battery_case: BatteryCase,
         charging: bool = False,
-        charge_level: int = 100,
+        charge_level: float = 100,
         elem_id: str = "charge-level",
     ):
         self.gap = battery_case.stroke_width
@@ -312,65 +167,68 @@ class LightningBolt:
     ORIGINAL_WIDTH = 120.0
     ORIGINAL_HEIGHT = 60.0
 
-    original_coordinates = [
-        l((23.51 / ORIGINAL_WIDTH), (-29.46 / ORIGINAL_HEIGHT)),
-        q(
-            (0.67 / ORIGINAL_WIDTH),
-            (-0.89 / ORIGINAL_HEIGHT),
-            (0.68 / ORIGINAL_WIDTH),
-            (-1.71 / ORIGINAL_HEIGHT),
-        ),
-        q(
-            (-0.16 / ORIGINAL_WIDTH),
-            (-1.72 / ORIGINAL_HEIGHT),
-            (-1.96 / ORIGINAL_WIDTH),
-            (-1.86 / ORIGINAL_HEIGHT),
-        ),
-        h((-14.48 / ORIGINAL_WIDTH)),
-        l((7.72 / ORIGINAL_WIDTH), (-20.77 / ORIGINAL_HEIGHT)),
-        q(
-            (0.6 / ORIGINAL_WIDTH),
-            (-2.94 / ORIGINAL_HEIGHT),
-            (-1.72 / ORIGINAL_WIDTH),
-            (-3.13 / ORIGINAL_HEIGHT),
-        ),
-        q(
-            (-1.02 / ORIGINAL_WIDTH),
-            (-0.02 / ORIGINAL_HEIGHT),
-            (-1.93 / ORIGINAL_WIDTH),
-            (1.05 / ORIGINAL_HEIGHT),
-        ),
-        l((-23.51 / ORIGINAL_WIDTH), (29.47 / ORIGINAL_HEIGHT)),
-        q(
-            (-0.69 / ORIGINAL_WIDTH),
-            (0.88 / ORIGINAL_HEIGHT),
-            (-0.73 / ORIGINAL_WIDTH),
-            (1.7 / ORIGINAL_HEIGHT),
-        ),
-        q(
-            (0.18 / ORIGINAL_WIDTH),
-            (1.73 / ORIGINAL_HEIGHT),
-            (1.97 / ORIGINAL_WIDTH),
-            (1.86 / ORIGINAL_HEIGHT),
-        ),
-        h((14.51 / ORIGINAL_WIDTH)),
-        l((-7.72 / ORIGINAL_WIDTH), (20.81 / ORIGINAL_HEIGHT)),
-        q(
-            (-0.64 / ORIGINAL_WIDTH),
-            (2.92 / ORIGINAL_HEIGHT),
-            (1.7 / ORIGINAL_WIDTH),
-            (3.1 / ORIGINAL_HEIGHT),
-        ),
-        q(
-            (1.04 / ORIGINAL_WIDTH),
-            (0.02 / ORIGINAL_HEIGHT),
-            (1.96 / ORIGINAL_WIDTH),
-            (-1.06 / ORIGINAL_HEIGHT),
-        ),
-        Z(),
-    ]
-
-    def __init__(  # noqa: C901
+    # Normalized outline starting at (0, 0), see ArrayPath.from_svg.
+    original_coordinates = ArrayPath.from_svg(
+        [
+            l((23.51 / ORIGINAL_WIDTH), (-29.46 / ORIGINAL_HEIGHT)),
+            q(
+                (0.67 / ORIGINAL_WIDTH),
+                (-0.89 / ORIGINAL_HEIGHT),
+                (0.68 / ORIGINAL_WIDTH),
+                (-1.71 / ORIGINAL_HEIGHT),
+            ),
+            q(
+                (-0.16 / ORIGINAL_WIDTH),
+                (-1.72 / ORIGINAL_HEIGHT),
+                (-1.96 / ORIGINAL_WIDTH),
+                (-1.86 / ORIGINAL_HEIGHT),
+            ),
+            h((-14.48 / ORIGINAL_WIDTH)),
+            l((7.72 / ORIGINAL_WIDTH), (-20.77 / ORIGINAL_HEIGHT)),
+            q(
+                (0.6 / ORIGINAL_WIDTH),
+                (-2.94 / ORIGINAL_HEIGHT),
+                (-1.72 / ORIGINAL_WIDTH),
+                (-3.13 / ORIGINAL_HEIGHT),
+            ),
+            q(
+                (-1.02 / ORIGINAL_WIDTH),
+                (-0.02 / ORIGINAL_HEIGHT),
+                (-1.93 / ORIGINAL_WIDTH),
+                (1.05 / ORIGINAL_HEIGHT),
+            ),
+            l((-23.51 / ORIGINAL_WIDTH), (29.47 / ORIGINAL_HEIGHT)),
+            q(
+                (-0.69 / ORIGINAL_WIDTH),
+                (0.88 / ORIGINAL_HEIGHT),
+                (-0.73 / ORIGINAL_WIDTH),
+                (1.7 / ORIGINAL_HEIGHT),
+            ),
+            q(
+                (0.18 / ORIGINAL_WIDTH),
+                (1.73 / ORIGINAL_HEIGHT),
+                (1.97 / ORIGINAL_WIDTH),
+                (1.86 / ORIGINAL_HEIGHT),
+            ),
+            h((14.51 / ORIGINAL_WIDTH)),
+            l((-7.72 / ORIGINAL_WIDTH), (20.81 / ORIGINAL_HEIGHT)),
+            q(
+                (-0.64 / ORIGINAL_WIDTH),
+                (2.92 / ORIGINAL_HEIGHT),
+                (1.7 / ORIGINAL_WIDTH),
+                (3.1 / ORIGINAL_HEIGHT),
+            ),
+            q(
+                (1.04 / ORIGINAL_WIDTH),
+                (0.02 / ORIGINAL_HEIGHT),
+                (1.96 / ORIGINAL_WIDTH),
+                (-1.06 / ORIGINAL_HEIGHT),
+            ),
+            Z(),
+        ]
+    )
+
+    def __init__(
         self,
         base_x: float,
         base_y: float,
@@ -395,59 +253,13 @@ class LightningBolt:
         x = base_x + (base_width * x_offset_percentage)
         y = base_y + (base_height * y_offset_percentage)
 
-        commands = _scale_path(
-            coordinates=self.original_coordinates,
+        self.outline = self.original_coordinates.transform(
             scale_x=scale_x,
             scale_y=scale_y,
             x_offset=x,
             y_offset=y,
         )
-
-        commands.insert(0, M(x, y))  # Start at the offset position
-
-        self.shape = skia.Path()
-        previous_command: dict[str, float] = {}
-        for cmd in commands:
-            if isinstance(cmd, M):
-                self.shape.moveTo(cmd.x, cmd.y)
-            elif isinstance(cmd, m):
-                self.shape.rMoveTo(cmd.dx, cmd.dy)
-            elif isinstance(cmd, L):
-                self.shape.lineTo(cmd.x, cmd.y)
-            elif isinstance(cmd, l):
-                self.shape.rLineTo(cmd.dx, cmd.dy)
-            elif isinstance(cmd, H):
-                self.shape.lineTo(cmd.x, previous_command.get("y", 0))
-            elif isinstance(cmd, h):
-                self.shape.rLineTo(cmd.dx, 0)
-            elif isinstance(cmd, V):
-                self.shape.lineTo(previous_command.get("x", 0), cmd.y)
-            elif isinstance(cmd, v):
-                self.shape.rLineTo(0, cmd.dy)
-            elif isinstance(cmd, C):
-                self.shape.cubicTo(cmd.x1, cmd.y1, cmd.x2, cmd.y2, cmd.x, cmd.y)
-            elif isinstance(cmd, c):
-                self.shape.rCubicTo(cmd.dx1, cmd.dy1, cmd.dx2, cmd.dy2, cmd.dx, cmd.dy)
-            elif isinstance(cmd, Q):
-                self.shape.quadTo(cmd.x1, cmd.y1, cmd.x, cmd.y)
-            elif isinstance(cmd, q):
-                self.shape.rQuadTo(cmd.dx1, cmd.dy1, cmd.dx, cmd.dy)
-            elif isinstance(cmd, Z):
-                pass  # We'll close the shape regardless at the end.
-            else:
-                print(f"Unknown command: {cmd}")
-
-            previous_command = {}
-            if hasattr(cmd, "x"):
-                previous_command["x"] = cmd.x
-            elif hasattr(cmd, "dx"):
-                previous_command["x"] = cmd.dx
-            if hasattr(cmd, "y"):
-                previous_command["y"] = cmd.y
-            elif hasattr(cmd, "dy"):
-                previous_command["y"] = cmd.dy
-
-        self.shape.close()
+        self.shape = self.outline.to_skia()
 
         if self.stroke_width > 0:
             paint = skia.Paint(
@@ -461,6 +273,49 @@ class LightningBolt:
             self.shape = outline
 
 
+@cache
+def _shared_components(
+    width: float,
+    bolt_x_offset_percentage: float,
+    bolt_y_offset_percentage: float,
+    bolt_total_scale: float,
+    bolt_mask_stroke_width: float,
+    charging: bool,
+) -> tuple[BatteryCase, Anode, LightningBolt, LightningBolt]:
+    """
+    Build the components that don't depend on the charge level.
+
+    Every level of a style/charge state shares the same case, anode and
+    lightning bolt, so they are built (and the case masked) once and reused.
+    The returned components must not be modified.
+
+    :return: tuple of (masked case, anode, lightning bolt, lightning bolt mask)
+    """
+    case = BatteryCase(width)
+    anode = Anode(case)
+    lightning_bolt = LightningBolt(
+        case.x,
+        case.y,
+        case.width,
+        case.height,
+        bolt_x_offset_percentage,
+        bolt_y_offset_percentage,
+        bolt_total_scale,
+    )
+    lightning_bolt_mask = LightningBolt(
+        case.x,
+        case.y,
+        case.width,
+        case.height,
+        bolt_x_offset_percentage,
+        bolt_y_offset_percentage,
+        bolt_total_scale,
+        stroke_width=bolt_mask_stroke_width,
+    )
+    case.path_and_mask(lightning_bolt_mask.shape if charging else None)
+    return case, anode, lightning_bolt, lightning_bolt_mask
+
+
 class Number:
     """
     Represents a number in the battery SVG.
@@ -476,26 +331,24 @@ class Number:
         base_height: float,
         x_offset_pct: float,
         font_path: Path,
-        level: int,
+        level: float,
         total_scale: float = 1.0,
         fill_color: int = skia.ColorBLACK,
     ):
         self.paint = skia.Paint(Style=skia.Paint.kFill_Style, Color=fill_color)
-        text = str(max(0, min(100, level)))
-        # Load typeface and set font size based on battery height
-        typeface = skia.Typeface.MakeFromFile(str(font_path))
-        if not typeface:
-            raise RuntimeError("Couldn't load font")
+        # Fractional levels show the whole percent they've reached.
+        text = str(int(max(0, min(100, level))))
+        # Typeface, font and digit outlines are cached per process, the font
+        # size is based on battery height.
         # font_size = base_height * total_scale * 0.6
         font_size = base_height * 0.6
-        font = skia.Font(typeface, font_size)
 
-        metrics = font.getMetrics()
+        metrics = get_metrics(font_path, font_size)
         center_offset = (metrics.fAscent + metrics.fDescent) / 2.0
         y_offset_pct = (base_height / 2.0 - center_offset) / base_height
 
         # Convert text → glyph IDs
-        glyph_ids = font.textToGlyphs(text, encoding=skia.TextEncoding.kUTF8)
+        glyph_ids = text_to_glyphs(font_path, font_size, text)
 
         # Compute starting pen position
         x = base_x + base_width * x_offset_pct
@@ -508,11 +361,10 @@ class Number:
         path = skia.Path()
         cursor = x
         for gid in glyph_ids:
-            glyph_path = font.getPath(gid)
+            glyph_path, advance = glyph_outline(font_path, font_size, gid)
             if glyph_path:
                 matrix = skia.Matrix.Translate(cursor, y)
                 path.addPath(glyph_path, matrix)
-            advance = font.getWidths([gid])[0]
             cursor += advance
 
         self.shape = path
@@ -551,7 +403,7 @@ class Battery(ABC):
 
     BASE_CASE_WIDTH = 120.0
 
-    def __init__(self, width: float, charging: bool, level: int, **kwargs: Path):
+    def __init__(self, width: float, charging: bool, level: float, **kwargs: Path):
         self.width = width
         self.charging = charging
         # Clamp level between 0 and 100
@@ -574,25 +426,58 @@ class Battery(ABC):
         """
         raise NotImplementedError("Subclasses must implement _assemble method.")
 
-    def build_svg(self, output_file: Path) -> None:
-        stream = skia.FILEWStream(str(output_file))
-        canvas = skia.SVGCanvas.Make(
-            bounds=(self.svg_width, self.svg_height), stream=stream
-        )  # type: ignore[call-arg]
-        # print(f"svg_width: {self.svg_width}, svg_height: {self.svg_height}")
+    def draw(self, canvas: skia.Canvas, color: int = skia.ColorBLACK) -> None:
+        """
+        Draw the battery onto a skia canvas, anti-aliased, in SVG units.
 
+        Args:
+            canvas: The canvas to draw on, already transformed to where the
+                battery goes.
+            color: The color to fill the battery with.
+        """
         for shape, paint in self.elements:
-            # print(f"Drawing shape: {shape}, with paint: {paint}")
-            # Draw each shape with its corresponding paint
-            if isinstance(shape, skia.Path):
-                canvas.drawPath(shape, paint)
-            elif isinstance(shape, skia.RRect):
-                canvas.drawRRect(shape, paint)
-            elif isinstance(shape, skia.Rect):
-                canvas.drawRect(shape, paint)
+            raster_paint = skia.Paint(paint)
+            raster_paint.setAntiAlias(True)
+            raster_paint.setColor(color)
+            canvas.drawPath(as_path(shape), raster_paint)
+
+    def render_svg(self, precision: int = SVG_PRECISION, merge: bool = False) -> bytes:
+        """
+        Serialize the battery as a minimal SVG without writing it.
+
+        Args:
+            precision: Decimal places kept in the path coordinates.
+            merge: Union all elements into a single path.
+        """
+        return render_svg(
+            self.elements, self.svg_width, self.svg_height, precision, merge
+        )
 
-        del canvas
-        stream.flush()
+    def build_svg(
+        self,
+        output_file: Path,
+        precision: int = SVG_PRECISION,
+        merge: bool = False,
+    ) -> bool:
+        """
+        Write the battery as a minimal SVG.
+
+        Args:
+            output_file: Where to write the SVG.
+            precision: Decimal places kept in the path coordinates.
+            merge: Union all elements into a single path.
+
+        Returns:
+            Whether the file was written, see ``write_svg``.
+        """
+        return write_svg(
+            self.elements,
+            self.svg_width,
+            self.svg_height,
+            output_file,
+            precision=precision,
+            merge=merge,
+        )
 
 
 class SimpleBattery(Battery):
@@ -606,7 +491,7 @@ class SimpleBattery(Battery):
         self,
         width: float = Battery.BASE_CASE_WIDTH,
         charging: bool = False,
-        level: int = 100,
+        level: float = 100,
         **kwargs: Path,
     ):
         super().__init__(width, charging, level)
@@ -616,34 +501,26 @@ class SimpleBattery(Battery):
         Assemble the battery components.
         This method defines the specific battery components for the SimpleBattery.
         """
-        self.case = BatteryCase(self.width)
-        self.anode = Anode(self.case)
-        self.charge_level = BatteryChargeLevel(self.case, self.charging, self.level)
-
         # Determine lightning bolt offsets:
         bolt_x_offset_percentage = 0.45
         bolt_y_offset_percentage = 0.96
 
-        self.lightning_bolt = LightningBolt(
-            self.case.x,
-            self.case.y,
-            self.case.width,
-            self.case.height,
-            bolt_x_offset_percentage,
-            bolt_y_offset_percentage,
-        )
-        self.lightning_bolt_mask = LightningBolt(
-            self.case.x,
-            self.case.y,
-            self.case.width,
-            self.case.height,
+        (
+            self.case,
+            self.anode,
+            self.lightning_bolt,
+            self.lightning_bolt_mask,
+        ) = _shared_components(
+            self.width,
             bolt_x_offset_percentage,
             bolt_y_offset_percentage,
-            stroke_width=12,
+            bolt_total_scale=1.0,
+            bolt_mask_stroke_width=12,
+            charging=self.charging,
         )
+        self.charge_level = BatteryChargeLevel(self.case, self.charging, self.level)
 
         mask = self.lightning_bolt_mask.shape if self.charging else None
-        self.case.path_and_mask(mask)
         self.charge_level.path_and_mask(mask)
 
         # Add elements to the list
@@ -667,7 +544,7 @@ class NumberBattery(Battery):
         self,
         width: float = Battery.BASE_CASE_WIDTH,
         charging: bool = False,
-        level: int = 100,
+        level: float = 100,
         font_path: Path = (FONTS_DIR / "OpenSans-Variable.ttf"),
     ):
         self.font_path = font_path
@@ -675,34 +552,25 @@ class NumberBattery(Battery):
 
     # TODO: Put number in the right place at the right size.  Pad to 2 digits minimum.  Figure out masking.
     def _assemble(self) -> None:
-        self.case = BatteryCase(self.width)
-        self.anode = Anode(self.case)
-        self.charge_level = BatteryChargeLevel(self.case, self.charging, self.level)
-
         # Determine lightning bolt offsets:
         bolt_x_offset_percentage = 0.75
         bolt_y_offset_percentage = 0.73
         lightning_bolt_total_scale = 0.5
 
-        self.lightning_bolt = LightningBolt(
-            self.case.x,
-            self.case.y,
-            self.case.width,
-            self.case.height,
+        (
+            self.case,
+            self.anode,
+            self.lightning_bolt,
+            self.lightning_bolt_mask,
+        ) = _shared_components(
+            self.width,
             bolt_x_offset_percentage,
             bolt_y_offset_percentage,
-            lightning_bolt_total_scale,
-        )
-        self.lightning_bolt_mask = LightningBolt(
-            self.case.x,
-            self.case.y,
-            self.case.width,
-            self.case.height,
-            bolt_x_offset_percentage,
-            bolt_y_offset_percentage,
-            lightning_bolt_total_scale,
-            stroke_width=4,
+            bolt_total_scale=lightning_bolt_total_scale,
+            bolt_mask_stroke_width=4,
+            charging=self.charging,
         )
+        self.charge_level = BatteryChargeLevel(self.case, self.charging, self.level)
         self.number = Number(
             base_x=self.case.x + (self.case.width * 0.1),
             base_y=self.case.y + (self.case.height * 0.1),
@@ -716,7 +584,6 @@ class NumberBattery(Battery):
 
         bolt_mask = self.lightning_bolt_mask.shape if self.charging else None
         number_mask = self.number.bounding_box
-        self.case.path_and_mask(bolt_mask)
         self.charge_level.path_and_mask(bolt_mask)
         self.charge_level.path_and_mask(number_mask)
         # self.number.path_and_mask(number_mask)
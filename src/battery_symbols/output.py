@@ -0,0 +1,291 @@
+import os
+from functools import partial
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from tempfile import mkstemp
+from queue import Queue
+from threading import Lock, Thread
+from types import TracebackType
+from typing import TYPE_CHECKING, BinaryIO, Optional
+
+from battery_symbols.config import WRITE_QUEUE_SIZE, WRITER_THREADS
+from battery_symbols.hashing import read_digest
+
+if TYPE_CHECKING:
+    from fontTools.ttLib import TTFont
+
+# Every generated file goes through here, so a build that changes nothing
+# reads its outputs back instead of writing them again.  Fonts are passed in
+# already loaded, so the CLI can import this module without fontTools.
+
+# mkstemp creates files only the owner can read, so new files get the mode a
+# plain open() would have given them.  Reading the umask means setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def is_unchanged(path: Path, data: bytes) -> bool:
+    """
+    Check whether a file already holds exactly ``data``, comparing the size
+    before reading it back.
+    """
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return read_digest(path) == sha256(data).hexdigest()
+    except FileNotFoundError:
+        return False
+
+
+def _mode(path: Path) -> int:
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _temp_file(path: Path) -> tuple[int, str]:
+    temp_file = partial(
+        mkstemp, dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        return temp_file()
+    except FileNotFoundError:
+        # Callers writing many files create their directories up front, so
+        # this only costs a syscall for the odd file in a new directory.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return temp_file()
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Write ``data`` to ``path`` unless the file already holds those bytes.
+
+    The data goes to a temporary file next to ``path`` that is then renamed
+    over it, so nothing ever sees a half-written file.
+
+    Returns:
+        Whether the file was written.
+    """
+    if is_unchanged(path, data):
+        return False
+
+    mode = _mode(path)
+    fd, temp_name = _temp_file(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(temp_name, mode)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return True
+
+
+class StagedFile:
+    """
+    A file too big to build in memory, streamed to a temporary file next to
+    ``path`` and renamed over it by ``commit``, like ``write_if_changed`` does,
+    unless ``path`` already holds the same bytes.
+
+    The temporary file is removed if the ``with`` block is left without
+    committing.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        fd, self._temp_name = _temp_file(path)
+        self.file: BinaryIO = os.fdopen(fd, "w+b")
+        self._done = False
+
+    def commit(self) -> bool:
+        """
+        Finish the file and move it into place.
+
+        Returns:
+            Whether ``path`` was written.
+        """
+        self.file.close()
+        self._done = True
+        temp_path = Path(self._temp_name)
+        try:
+            unchanged = self.path.stat().st_size == temp_path.stat().st_size and (
+                read_digest(self.path) == read_digest(temp_path)
+            )
+        except FileNotFoundError:
+            unchanged = False
+        try:
+            if unchanged:
+                return False
+            os.chmod(temp_path, _mode(self.path))
+            os.replace(temp_path, self.path)
+            return True
+        finally:
+            if unchanged:
+                temp_path.unlink()
+
+    def abort(self) -> None:
+        """
+        Throw the temporary file away.
+        """
+        if self._done:
+            return
+        self.file.close()
+        self._done = True
+        os.unlink(self._temp_name)
+
+    def __enter__(self) -> "StagedFile":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.abort()
+
+
+def font_bytes(font: "TTFont") -> bytes:
+    """Compile a font in memory."""
+    buffer = BytesIO()
+    font.save(buffer)
+    return buffer.getvalue()
+
+
+def save_font(font: "TTFont", font_file: Path) -> bool:
+    """
+    Save a font unless the file already holds the same font.
+
+    The head table's timestamps are saved as they are rather than set to the
+    current time, so a font that hasn't changed compiles to the same bytes.
+
+    Returns:
+        Whether the file was written.
+    """
+    recalc_timestamp = font.recalcTimestamp
+    font.recalcTimestamp = False
+    try:
+        return write_if_changed(font_file, font_bytes(font))
+    finally:
+        font.recalcTimestamp = recalc_timestamp
+
+
+class OutputReport:
+    """
+    Collects which generated files were written and which already held the
+    same bytes.  Files can be recorded from several threads at once.
+    """
+
+    def __init__(self) -> None:
+        self.written: list[Path] = []
+        self.unchanged: list[Path] = []
+        self._lock = Lock()
+
+    def record(self, path: Path, written: bool, verbose: bool = False) -> bool:
+        """
+        Record the outcome of writing ``path``.
+
+        Args:
+            path: The file.
+            written: Whether it was written.
+            verbose: Also print whether it was written.
+
+        Returns:
+            ``written``, so a write can be recorded where it happens.
+        """
+        with self._lock:
+            (self.written if written else self.unchanged).append(path)
+        if verbose:
+            print(f"Wrote {path}." if written else f"{path} is unchanged.")
+        return written
+
+    def summary(self) -> str:
+        return f"Wrote {len(self.written)} files, {len(self.unchanged)} were unchanged."
+
+
+class BackgroundWriter:
+    """
+    Writes files with ``write_if_changed`` on a pool of threads, so whoever
+    produces the data can carry on while earlier files are still going to
+    disk.
+
+    The threads are fed through a bounded queue: ``submit`` blocks while it's
+    full, so a slow disk holds the producer back instead of piling up data in
+    memory.  With no threads, ``submit`` writes the file itself.
+
+    Errors in the threads are raised again from the next ``submit`` or from
+    ``close``.
+    """
+
+    def __init__(
+        self,
+        threads: int = WRITER_THREADS,
+        queue_size: int = WRITE_QUEUE_SIZE,
+        report: Optional[OutputReport] = None,
+    ):
+        self.report = report or OutputReport()
+        self._queue: Queue[Optional[tuple[Path, bytes]]] = Queue(maxsize=queue_size)
+        self._errors: list[Exception] = []
+        self._threads = [
+            Thread(target=self._drain, daemon=True) for _ in range(threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _write(self, path: Path, data: bytes) -> None:
+        self.report.record(path, write_if_changed(path, data))
+
+    def _drain(self) -> None:
+        # Keep draining after an error, so submit never blocks on a full queue.
+        while (item := self._queue.get()) is not None:
+            try:
+                self._write(*item)
+            except Exception as error:
+                self._errors.append(error)
+
+    def _raise_error(self) -> None:
+        if self._errors:
+            raise self._errors[0]
+
+    def submit(self, path: Path, data: bytes) -> None:
+        """
+        Queue ``data`` to be written to ``path``, waiting while the queue is
+        full.
+        """
+        self._raise_error()
+        if not self._threads:
+            self._write(path, data)
+            return
+        self._queue.put((path, data))
+
+    def close(self) -> None:
+        """
+        Wait for every queued file to be written.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._raise_error()
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc is None:
+            self.close()
+            return
+        # Let the queued files finish, but don't hide the original error.
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,143 @@
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+import skia
+from svg import C, H, L, M, PathData, Q, V, Z, c, h, l, m, q, v
+
+# Verbs share skia's numbering so they can be handed to skia.Path.Make as is.
+MOVE = int(skia.Path.kMove_Verb)
+LINE = int(skia.Path.kLine_Verb)
+QUAD = int(skia.Path.kQuad_Verb)
+CUBIC = int(skia.Path.kCubic_Verb)
+CLOSE = int(skia.Path.kClose_Verb)
+
+
+class ArrayPath:
+    """
+    A compact, immutable path: one verb per segment plus a contiguous (N, 2)
+    buffer of absolute coordinates.  Transforms and bounds are whole-array
+    operations rather than a walk over command objects.
+    """
+
+    def __init__(self, verbs: npt.ArrayLike, points: npt.ArrayLike):
+        self.verbs = np.asarray(verbs, dtype=np.uint8)
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+    @classmethod
+    def from_svg(  # noqa: C901
+        cls, commands: list[PathData], start: tuple[float, float] = (0.0, 0.0)
+    ) -> "ArrayPath":
+        """
+        Convert svg.py path commands to an ArrayPath.
+
+        Relative commands are resolved against ``start``, and an initial move
+        to ``start`` is added if the commands don't begin with one.
+
+        Args:
+            commands: The svg.py commands to convert.
+            start: The current point before the first command.
+
+        Returns:
+            The equivalent path in absolute coordinates.
+        """
+        verbs: list[int] = []
+        points: list[tuple[float, float]] = []
+        x, y = start
+        contour_start = start
+
+        def add(verb: int, *pts: tuple[float, float]) -> None:
+            verbs.append(verb)
+            points.extend(pts)
+
+        if not commands or not isinstance(commands[0], (M, m)):
+            add(MOVE, (x, y))
+
+        for cmd in commands:
+            if isinstance(cmd, M):
+                x, y = cmd.x, cmd.y  # type: ignore
+                contour_start = (x, y)
+                add(MOVE, (x, y))
+            elif isinstance(cmd, m):
+                x, y = x + cmd.dx, y + cmd.dy  # type: ignore
+                contour_start = (x, y)
+                add(MOVE, (x, y))
+            elif isinstance(cmd, L):
+                x, y = cmd.x, cmd.y  # type: ignore
+                add(LINE, (x, y))
+            elif isinstance(cmd, l):
+                x, y = x + cmd.dx, y + cmd.dy  # type: ignore
+                add(LINE, (x, y))
+            elif isinstance(cmd, H):
+                x = cmd.x  # type: ignore
+                add(LINE, (x, y))
+            elif isinstance(cmd, h):
+                x += cmd.dx  # type: ignore
+                add(LINE, (x, y))
+            elif isinstance(cmd, V):
+                y = cmd.y  # type: ignore
+                add(LINE, (x, y))
+            elif isinstance(cmd, v):
+                y += cmd.dy  # type: ignore
+                add(LINE, (x, y))
+            elif isinstance(cmd, C):
+                add(CUBIC, (cmd.x1, cmd.y1), (cmd.x2, cmd.y2), (cmd.x, cmd.y))  # type: ignore
+                x, y = cmd.x, cmd.y  # type: ignore
+            elif isinstance(cmd, c):
+                add(
+                    CUBIC,
+                    (x + cmd.dx1, y + cmd.dy1),  # type: ignore
+                    (x + cmd.dx2, y + cmd.dy2),  # type: ignore
+                    (x + cmd.dx, y + cmd.dy),  # type: ignore
+                )
+                x, y = x + cmd.dx, y + cmd.dy  # type: ignore
+            elif isinstance(cmd, Q):
+                add(QUAD, (cmd.x1, cmd.y1), (cmd.x, cmd.y))  # type: ignore
+                x, y = cmd.x, cmd.y  # type: ignore
+            elif isinstance(cmd, q):
+                add(QUAD, (x + cmd.dx1, y + cmd.dy1), (x + cmd.dx, y + cmd.dy))  # type: ignore
+                x, y = x + cmd.dx, y + cmd.dy  # type: ignore
+            elif isinstance(cmd, Z):
+                add(CLOSE)
+                x, y = contour_start
+            else:
+                raise TypeError(f"Unsupported path command: {type(cmd)}")
+
+        return cls(verbs, points)
+
+    def transform(
+        self,
+        scale_x: float = 1.0,
+        scale_y: float = 1.0,
+        x_offset: float = 0.0,
+        y_offset: float = 0.0,
+    ) -> "ArrayPath":
+        """
+        Scale then translate every point.
+
+        Returns:
+            A new, transformed path.
+        """
+        scaled = self.points * (scale_x, scale_y) + (x_offset, y_offset)
+        return ArrayPath(self.verbs, scaled)
+
+    def bounds(self) -> Optional[tuple[float, float, float, float]]:
+        """
+        Compute the bounding box of the path's points (control points included).
+
+        :return: tuple of (min_x, min_y, max_x, max_y), or None for an empty path
+        """
+        if not len(self.points):
+            return None
+        min_x, min_y = self.points.min(axis=0)
+        max_x, max_y = self.points.max(axis=0)
+        return float(min_x), float(min_y), float(max_x), float(max_y)
+
+    def to_skia(self) -> skia.Path:
+        """
+        Build the equivalent skia path in a single call.
+        """
+        points = [skia.Point(x, y) for x, y in self.points.tolist()]
+        return skia.Path.Make(
+            points, self.verbs.tolist(), [], skia.PathFillType.kWinding
+        )
@@ -0,0 +1,101 @@
+from math import sqrt
+
+import skia
+from fontTools.pens.basePen import AbstractPen
+
+# Same tolerance skia uses when it flattens conics for SVG output, so glyphs
+# drawn straight from the models match the ones drawn from the SVG files.
+CONIC_TOLERANCE = 1 / 1024
+MAX_CONIC_TO_QUAD_POW2 = 5
+
+
+def _conic_quad_pow2(
+    p0: skia.Point, p1: skia.Point, p2: skia.Point, weight: float
+) -> int:
+    """
+    Work out how many quads (as a power of two) a conic needs to stay within
+    CONIC_TOLERANCE.  Mirrors ``SkConic::computeQuadPOW2``.
+    """
+    a = weight - 1
+    k = a / (4 * (2 + a))
+    x = k * (p0.x() - 2 * p1.x() + p2.x())
+    y = k * (p0.y() - 2 * p1.y() + p2.y())
+    error = sqrt(x * x + y * y)
+    pow2 = 0
+    while pow2 < MAX_CONIC_TO_QUAD_POW2 and error > CONIC_TOLERANCE:
+        error *= 0.25
+        pow2 += 1
+    return pow2
+
+
+def _draw_conic(points: list[skia.Point], weight: float, pen: AbstractPen) -> None:
+    """
+    Draw a conic as a run of quadratic curves.
+    """
+    p0, p1, p2 = points
+    pow2 = _conic_quad_pow2(p0, p1, p2, weight)
+    quads = skia.Path.ConvertConicToQuads(p0, p1, p2, weight, pow2)
+    for i in range(1, len(quads), 2):
+        pen.qCurveTo(tuple(quads[i]), tuple(quads[i + 1]))
+
+
+def draw_skia_path(path: skia.Path, pen: AbstractPen) -> None:  # noqa: C901
+    """
+    Replay a skia path into a fontTools pen.
+
+    Conics have no pen equivalent, so they are approximated with quadratic
+    curves the same way skia does when it writes them to an SVG.
+
+    Args:
+        path: The path to draw.
+        pen: Any pen implementing the fontTools pen protocol.
+    """
+    iterator = skia.Path.RawIter(path)
+    open_contour = False
+    while True:
+        verb, points = iterator.next()
+        if verb == skia.Path.kDone_Verb:
+            break
+        if verb == skia.Path.kMove_Verb:
+            if open_contour:
+                pen.endPath()
+            pen.moveTo(tuple(points[0]))
+            open_contour = True
+        elif verb == skia.Path.kLine_Verb:
+            pen.lineTo(tuple(points[1]))
+        elif verb == skia.Path.kQuad_Verb:
+            pen.qCurveTo(tuple(points[1]), tuple(points[2]))
+        elif verb == skia.Path.kConic_Verb:
+            _draw_conic(points, iterator.conicWeight(), pen)
+        elif verb == skia.Path.kCubic_Verb:
+            pen.curveTo(tuple(points[1]), tuple(points[2]), tuple(points[3]))
+        elif verb == skia.Path.kClose_Verb:
+            pen.closePath()
+            open_contour = False
+    if open_contour:
+        pen.endPath()
+
+
+def as_path(shape: skia.Path | skia.RRect | skia.Rect) -> skia.Path:
+    """
+    Convert any shape a Battery element can hold to a path.
+    """
+    if isinstance(shape, skia.RRect):
+        return skia.Path().addRRect(shape)
+    if isinstance(shape, skia.Rect):
+        return skia.Path().addRect(shape)
+    return shape
+
+
+def draw_elements(
+    elements: list[tuple[skia.Path, skia.Paint]], pen: AbstractPen
+) -> None:
+    """
+    Replay every shape of a battery's ``elements`` into a fontTools pen.
+
+    Args:
+        elements: The (shape, paint) pairs assembled by a Battery.
+        pen: Any pen implementing the fontTools pen protocol.
+    """
+    for shape, _paint in elements:
+        draw_skia_path(as_path(shape), pen)
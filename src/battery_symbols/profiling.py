@@ -0,0 +1,183 @@
+import json
+import sys
+from argparse import ArgumentParser, Namespace
+from collections.abc import Iterator
+from contextlib import contextmanager
+from cProfile import Profile
+from io import StringIO
+from pathlib import Path
+from pstats import SortKey, Stats
+from time import perf_counter
+from typing import Any, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+def peak_rss_kb() -> Optional[int]:
+    """
+    Get the peak resident set size of this process and its finished children.
+
+    Returns:
+        The peak RSS in KiB, or None where the platform can't report it.
+    """
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and KiB everywhere else.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class StageTiming:
+    """The measurements taken for one pipeline stage."""
+
+    def __init__(self, name: str, seconds: float, items: int, peak_rss: Optional[int]):
+        self.name = name
+        self.seconds = seconds
+        self.items = items
+        self.peak_rss = peak_rss
+        self.stats: Optional[Stats] = None
+
+    @property
+    def items_per_second(self) -> Optional[float]:
+        if not self.items or not self.seconds:
+            return None
+        return self.items / self.seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "items": self.items,
+            "items_per_second": self.items_per_second,
+            "peak_rss_kb": self.peak_rss,
+        }
+
+
+class StageProfiler:
+    """
+    Times the stages of a CLI run, and optionally captures cProfile stats per
+    stage.  A disabled profiler does nothing, so call sites don't need to
+    check whether profiling was requested.
+    """
+
+    def __init__(self, enabled: bool = False, cprofile_dir: Optional[Path] = None):
+        self.enabled = enabled or cprofile_dir is not None
+        self.cprofile_dir = cprofile_dir
+        self.stages: list[StageTiming] = []
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Iterator[StageTiming]:
+        """
+        Time the body of a ``with`` block as a named stage.
+
+        Args:
+            name: The stage name used in the report.
+            items: How many glyphs (or other items) the stage processes, used
+                for the throughput figure.  May be updated on the yielded
+                timing once the count is known.
+        """
+        timing = StageTiming(name, 0.0, items, None)
+        if not self.enabled:
+            yield timing
+            return
+
+        profile = Profile() if self.cprofile_dir is not None else None
+        start = perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield timing
+        finally:
+            if profile is not None:
+                profile.disable()
+            timing.seconds = perf_counter() - start
+            timing.peak_rss = peak_rss_kb()
+            if profile is not None and self.cprofile_dir is not None:
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(self.cprofile_dir / f"{name}.prof")
+                timing.stats = Stats(profile, stream=StringIO())
+            self.stages.append(timing)
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "total_seconds": sum(stage.seconds for stage in self.stages),
+            "peak_rss_kb": peak_rss_kb(),
+            "stages": [stage.as_dict() for stage in self.stages],
+        }
+
+    def format_text(self, top: int = 10) -> str:
+        """
+        Format the report as a table, followed by the hottest functions of
+        each stage when cProfile stats were captured.
+        """
+        lines = [
+            f"{'stage':<24} {'seconds':>10} {'items':>8} {'items/s':>10} {'peak RSS':>12}"
+        ]
+        for stage in self.stages:
+            rate = stage.items_per_second
+            rss = "-" if stage.peak_rss is None else f"{stage.peak_rss / 1024:.1f} MiB"
+            lines.append(
+                f"{stage.name:<24} {stage.seconds:>10.3f} {stage.items or '-':>8} "
+                f"{'-' if rate is None else f'{rate:.1f}':>10} {rss:>12}"
+            )
+        report = self.report()
+        lines.append(f"{'total':<24} {report['total_seconds']:>10.3f}")
+
+        for stage in self.stages:
+            if stage.stats is None:
+                continue
+            stream = StringIO()
+            stage.stats.stream = stream  # type: ignore[attr-defined]
+            stage.stats.sort_stats(SortKey.CUMULATIVE).print_stats(top)
+            lines.append(f"\n--- {stage.name} ---\n{stream.getvalue().strip()}")
+        return "\n".join(lines)
+
+    def write(self, output_file: Optional[Path] = None) -> None:
+        """
+        Write the report: JSON if ``output_file`` ends in ``.json``, text
+        otherwise, and text on stderr if there's no file at all.
+        """
+        if not self.enabled:
+            return
+        if output_file is None:
+            print(self.format_text(), file=sys.stderr)
+        elif output_file.suffix == ".json":
+            output_file.write_text(json.dumps(self.report(), indent=2) + "\n")
+        else:
+            output_file.write_text(self.format_text() + "\n")
+
+
+def add_profile_arguments(parser: ArgumentParser) -> None:
+    """
+    Add the ``--profile`` options shared by the CLI entry points.
+    """
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each stage and print a report to stderr.",
+    )
+    group.add_argument(
+        "--profile-output",
+        type=Path,
+        help="Write the profile report here instead (JSON if the name ends in .json).",
+    )
+    group.add_argument(
+        "--cprofile",
+        type=Path,
+        metavar="DIR",
+        help="Also capture cProfile stats per stage, saved as DIR/<stage>.prof.",
+    )
+
+
+def profiler_from_args(args: Namespace) -> StageProfiler:
+    return StageProfiler(
+        enabled=args.profile or args.profile_output is not None,
+        cprofile_dir=args.cprofile,
+    )
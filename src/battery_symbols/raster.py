@@ -0,0 +1,250 @@
+import json
+from argparse import ArgumentParser
+from collections import defaultdict
+from math import ceil
+from pathlib import Path
+from typing import Any, Optional
+
+import skia
+
+from battery_symbols.args import (
+    add_matrix_arguments,
+    matrix_from_args,
+    positive_int,
+)
+from battery_symbols.config import (
+    ATLAS_COLUMNS,
+    FONTS_DIR,
+    RASTER_DIR,
+    RASTER_SIZES,
+)
+from battery_symbols.generate import (
+    BATTERY_STYLES,
+    BUILD_MATRIX,
+    BuildMatrix,
+    GlyphJob,
+    glyph_jobs,
+    glyph_name,
+    make_battery,
+)
+from battery_symbols.models import Battery
+from battery_symbols.output import OutputReport, write_if_changed
+from battery_symbols.profiling import (
+    StageProfiler,
+    add_profile_arguments,
+    profiler_from_args,
+)
+from battery_symbols.runtime import (
+    CASE_WIDTH,
+    level_percent,
+)
+
+# Raster icons for consumers that can't use the font.  Every glyph of a style
+# and case width goes into one sprite atlas PNG per pixel size, and a JSON
+# index gives each glyph's rectangle in its atlas.  An atlas is drawn on a
+# single skia surface and encoded once, and each battery model is built once
+# for all the sizes.
+
+INDEX_NAME = "atlas.json"
+INDEX_VERSION = 1
+
+# (x, y, width, height) in pixels
+Rect = tuple[int, int, int, int]
+
+
+def atlas_name(style: str, width: int, size: int) -> str:
+    """
+    Get the file name of a style's atlas at a pixel size.
+    """
+    suffix = "" if width == CASE_WIDTH else f"_w{width}"
+    return f"battery_{style}{suffix}_{size}px.png"
+
+
+def cell_rect(position: int, size: int, columns: int = ATLAS_COLUMNS) -> Rect:
+    """
+    Get the rectangle of a cell in an atlas grid, filled row by row.
+    """
+    row, column = divmod(position, columns)
+    return column * size, row * size, size, size
+
+
+def draw_atlas(
+    batteries: list[Battery],
+    size: int,
+    columns: int = ATLAS_COLUMNS,
+    color: int = skia.ColorBLACK,
+    margin: float = 0.9,
+) -> bytes:
+    """
+    Draw batteries into a grid of square cells on a single surface.
+
+    Each battery is scaled and centered in its cell like a glyph in the font's
+    em square, and clipped to the cell so nothing bleeds into its neighbours.
+
+    Args:
+        batteries: The batteries, in cell order.
+        size: The cell size in pixels.
+        columns: Cells per row.
+        color: The color to draw the batteries in, on a transparent background.
+        margin: Fraction of the cell a battery may take up.
+
+    Returns:
+        The atlas as a PNG.
+
+    Raises:
+        ValueError: If there are no batteries, the size or columns aren't
+            positive, or the atlas is too big for a surface.
+    """
+    if not batteries:
+        raise ValueError("Can't draw an atlas without any batteries.")
+    if size <= 0 or columns <= 0:
+        raise ValueError(
+            f"Cell size and columns must be positive, got {size} and {columns}"
+        )
+    rows = ceil(len(batteries) / columns)
+    atlas_width, atlas_height = size * min(columns, len(batteries)), size * rows
+    surface = skia.Surface.MakeRasterN32Premul(atlas_width, atlas_height)
+    if surface is None:
+        raise ValueError(
+            f"Can't create a {atlas_width}x{atlas_height} pixel surface for the atlas."
+        )
+    canvas = surface.getCanvas()
+    canvas.clear(skia.ColorTRANSPARENT)
+    for position, battery in enumerate(batteries):
+        x, y, width, height = cell_rect(position, size, columns)
+        scale = size * margin / max(battery.svg_width, battery.svg_height)
+        canvas.save()
+        canvas.clipRect(skia.Rect.MakeXYWH(x, y, width, height))
+        canvas.translate(
+            x + (size - battery.svg_width * scale) / 2,
+            y + (size - battery.svg_height * scale) / 2,
+        )
+        canvas.scale(scale, scale)
+        battery.draw(canvas, color)
+        canvas.restore()
+    return bytes(surface.makeImageSnapshot().encodeToData(skia.kPNG, 100))
+
+
+def _glyph_entry(job: GlyphJob, rect: Rect) -> dict[str, Any]:
+    _style_index, charge, level, steps, _width = job
+    return {
+        "name": glyph_name(job),
+        "state": "charge" if charge else "discharge",
+        "level": level_percent(level, steps),
+        "rect": list(rect),
+    }
+
+
+def write_atlases(
+    output_dir: Path = RASTER_DIR,
+    sizes: tuple[int, ...] = RASTER_SIZES,
+    matrix: BuildMatrix = BUILD_MATRIX,
+    font_path: Path = FONTS_DIR / "OpenSans-Variable.ttf",
+    columns: int = ATLAS_COLUMNS,
+    profiler: Optional[StageProfiler] = None,
+    report: Optional[OutputReport] = None,
+) -> dict[str, Any]:
+    """
+    Write a sprite atlas PNG for every style and case width of ``matrix`` at
+    each pixel size, and the JSON index of where each glyph is.
+
+    The index lists the atlases with their style, case width and pixel size,
+    and for each glyph its name, charge state, level and (x, y, width,
+    height) rectangle in pixels.
+
+    Args:
+        output_dir: The directory to write the atlases and index to.
+        sizes: The cell sizes in pixels.
+        matrix: The glyphs to draw.
+        font_path: The font used by styles that render text.
+        columns: Cells per atlas row.
+        profiler: Times each stage.
+        report: Records which files were written and which were unchanged.
+
+    Returns:
+        The index.
+    """
+    profiler = profiler or StageProfiler()
+    report = report or OutputReport()
+    groups: dict[tuple[int, int], list[GlyphJob]] = defaultdict(list)
+    for job in glyph_jobs(matrix):
+        groups[job[0], job[4]].append(job)
+
+    atlases = []
+    with profiler.stage("raster", len(matrix) * len(sizes)):
+        for (style_index, width), jobs in groups.items():
+            style = BATTERY_STYLES[style_index][1]
+            batteries = [make_battery(job, font_path) for job in jobs]
+            for size in sizes:
+                atlas_file = output_dir / atlas_name(style, width, size)
+                png = draw_atlas(batteries, size, columns)
+                report.record(atlas_file, write_if_changed(atlas_file, png))
+                atlases.append(
+                    {
+                        "file": atlas_file.name,
+                        "style": style,
+                        "width": width,
+                        "size": size,
+                        "glyphs": [
+                            _glyph_entry(job, cell_rect(position, size, columns))
+                            for position, job in enumerate(jobs)
+                        ],
+                    }
+                )
+
+    index = {"version": INDEX_VERSION, "atlases": atlases}
+    index_file = output_dir / INDEX_NAME
+    data = json.dumps(index, indent=1).encode()
+    report.record(index_file, write_if_changed(index_file, data))
+    return index
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(
+        description="Draw the glyphs into sprite atlas PNGs with a JSON index."
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=RASTER_DIR,
+        help="The directory to write the atlases to (default: the build directory).",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=positive_int,
+        nargs="+",
+        default=list(RASTER_SIZES),
+        help=f"Pixel sizes to draw the glyphs at (default: {' '.join(map(str, RASTER_SIZES))}).",
+    )
+    parser.add_argument(
+        "--columns",
+        type=positive_int,
+        default=ATLAS_COLUMNS,
+        help=f"Glyphs per atlas row (default: {ATLAS_COLUMNS}).",
+    )
+    add_matrix_arguments(parser, "draw")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args)
+    matrix = matrix_from_args(parser, args)
+    report = OutputReport()
+
+    try:
+        index = write_atlases(
+            args.output,
+            tuple(args.sizes),
+            matrix,
+            columns=args.columns,
+            profiler=profiler,
+            report=report,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Drew {len(index['atlases'])} atlases.")
+    print(report.summary())
+    profiler.write(args.profile_output)
+
+
+if __name__ == "__main__":
+    main()
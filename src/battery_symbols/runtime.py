@@ -0,0 +1,211 @@
+from functools import lru_cache
+from pathlib import Path
+from re import compile
+from typing import Optional, Union
+
+from battery_symbols.config import CODEPOINTS_FILE
+
+# Codepoint lookup for status bars and other scripts that run often.  This
+# module only uses the standard library and must stay that way, so it can be
+# imported without the skia and fontTools stack the build needs.
+
+BASE_CODEPOINT = 0xF2000  # starting codepoint
+
+# Must match the style names in generate.BATTERY_STYLES, in the same order.
+STYLE_NAMES = ("simple", "number")
+LEVELS = range(101)
+LEVEL_STEPS = LEVELS[-1]  # levels per full charge in the default glyphs
+CASE_WIDTH = 120  # case width of the default glyphs
+
+# The default glyphs (whole percent levels at the default case width) always
+# get these codepoints: by style index, then charging before discharging, then
+# level.  Every other glyph gets the codepoint recorded in CODEPOINTS_FILE when
+# it was first built, see codepoints.CodepointIndex.
+_STATE_SIZE = len(LEVELS)
+_STYLE_SIZE = 2 * _STATE_SIZE
+_STYLE_INDEX = {name: index for index, name in enumerate(STYLE_NAMES)}
+
+GLYPH_NAME_PATTERN = compile(
+    r"battery_([^_]+)(?:_w(\d+))?_(charge|discharge)_(\d{2,})$"
+)
+
+
+def format_glyph_name(
+    style: str,
+    charging: bool,
+    level: int,
+    steps: int = LEVEL_STEPS,
+    width: int = CASE_WIDTH,
+) -> str:
+    """
+    Get the name of a battery glyph, e.g. ``battery_simple_charge_042``.
+
+    The level is zero-padded to one digit more than ``steps`` has zeros, so
+    ``battery_simple_charge_0425`` is the per-mille glyph for 42.5%.  Glyphs
+    at another case width get a ``_w<width>`` suffix on the style.
+
+    Args:
+        style: The style name.
+        charging: Whether it's the charging glyph.
+        level: The charge level, out of ``steps``.
+        steps: Levels per full charge, a power of ten.
+        width: The case width.
+    """
+    state = "charge" if charging else "discharge"
+    suffix = "" if width == CASE_WIDTH else f"_w{width}"
+    return f"battery_{style}{suffix}_{state}_{level:0>{len(str(steps))}}"
+
+
+def level_percent(level: int, steps: int = LEVEL_STEPS) -> Union[int, float]:
+    """
+    Convert a level out of ``steps`` to a percentage, an int when it's whole.
+    """
+    percent = level * 100 / steps
+    return int(percent) if percent.is_integer() else percent
+
+
+def parse_glyph_name(
+    name: str,
+) -> Optional[tuple[str, int, str, Union[int, float]]]:
+    """
+    Split a battery glyph name made by ``format_glyph_name`` into its parts.
+
+    Returns:
+        tuple of (style, case width, "charge"/"discharge", level in percent),
+        or None if the name doesn't follow the naming scheme.
+    """
+    match = GLYPH_NAME_PATTERN.search(name)
+    if not match:
+        return None
+    style, width, state, level = match.groups()
+    return (
+        style,
+        CASE_WIDTH if width is None else int(width),
+        state,
+        level_percent(int(level), 10 ** (len(level) - 1)),
+    )
+
+
+@lru_cache
+def _load_index(index_file: Path) -> dict[str, int]:
+    # Only glyphs outside the default set need the index, so json is only
+    # imported when one is looked up.
+    import json
+
+    try:
+        with open(index_file) as f:
+            glyphs: dict[str, int] = json.load(f)["glyphs"]
+            return glyphs
+    except (FileNotFoundError, KeyError, ValueError):
+        return {}
+
+
+def codepoint(
+    style: Union[str, int],
+    charging: bool,
+    level: int,
+    steps: int = LEVEL_STEPS,
+    width: int = CASE_WIDTH,
+    index_file: Path = CODEPOINTS_FILE,
+) -> int:
+    """
+    Get the codepoint of a battery glyph.
+
+    Args:
+        style: The style name (e.g. ``"simple"``) or its index.
+        charging: Whether to show the charging glyph.
+        level: The charge level, 0 to ``steps``.
+        steps: Levels per full charge, 100 for the default glyphs.
+        width: The case width.
+        index_file: Where the codepoints of the glyphs outside the default set
+            are looked up.
+
+    Returns:
+        The glyph's codepoint in BatterySymbols-Regular.ttf.
+
+    Raises:
+        ValueError: If the style or level doesn't exist, or the glyph was never
+            built.
+    """
+    if isinstance(style, str):
+        try:
+            style_index = _STYLE_INDEX[style]
+        except KeyError:
+            raise ValueError(f"Unknown battery style: {style!r}") from None
+    elif 0 <= style < len(STYLE_NAMES):
+        style_index = style
+    else:
+        raise ValueError(f"Unknown battery style: {style!r}")
+    if not 0 <= level <= steps:
+        raise ValueError(f"Level must be between 0 and {steps}, got {level}")
+
+    if steps == LEVEL_STEPS and width == CASE_WIDTH:
+        return (
+            BASE_CODEPOINT
+            + style_index * _STYLE_SIZE
+            + (0 if charging else _STATE_SIZE)
+            + level
+        )
+
+    name = format_glyph_name(STYLE_NAMES[style_index], charging, level, steps, width)
+    try:
+        return _load_index(index_file)[name]
+    except KeyError:
+        raise ValueError(f"{name} isn't in {index_file.name}, build it first") from None
+
+
+def glyph(
+    style: Union[str, int],
+    charging: bool,
+    level: int,
+    steps: int = LEVEL_STEPS,
+    width: int = CASE_WIDTH,
+) -> str:
+    """
+    Get the character of a battery glyph.  Takes the same arguments as
+    ``codepoint``.
+    """
+    return chr(codepoint(style, charging, level, steps, width))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    # Only the CLI needs argparse, so importing the module doesn't load it.
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Print the battery glyph for a level.")
+    parser.add_argument(
+        "level", type=int, help="The charge level, out of --steps (0-100 by default)."
+    )
+    parser.add_argument(
+        "-s",
+        "--style",
+        choices=STYLE_NAMES,
+        default=STYLE_NAMES[0],
+        help=f"The battery style (default: {STYLE_NAMES[0]}).",
+    )
+    parser.add_argument(
+        "-c", "--charging", action="store_true", help="Show the charging glyph."
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=LEVEL_STEPS,
+        help=f"Levels per full charge, e.g. 1000 for per-mille glyphs (default: {LEVEL_STEPS}).",
+    )
+    parser.add_argument(
+        "-w",
+        "--width",
+        type=int,
+        default=CASE_WIDTH,
+        help=f"The case width (default: {CASE_WIDTH}).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        print(glyph(args.style, args.charging, args.level, args.steps, args.width))
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
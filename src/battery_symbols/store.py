@@ -0,0 +1,252 @@
+import mmap
+import struct
+from argparse import ArgumentParser
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import Optional
+
+from battery_symbols.config import RAW_DIR, WRITER_THREADS
+from battery_symbols.output import BackgroundWriter, OutputReport, StagedFile
+
+# A glyph store packs the generated SVGs into one file, so a build reads a
+# single memory-mapped file instead of opening one file per glyph.  The layout
+# is a header, then one (offset, length) entry per glyph, then the glyph names
+# joined by newlines, then the SVG documents back to back.  All numbers are
+# little-endian and offsets count from the start of the file.
+
+STORE_NAME = "glyphs.pack"
+MAGIC = b"BSYMPACK"
+STORE_VERSION = 1
+
+# magic, version, glyph count, size of the names block
+_HEADER = struct.Struct("<8sHII")
+# offset, length
+_ENTRY = struct.Struct("<QI")
+
+
+class StoreWriter:
+    """
+    Streams a glyph store to disk without holding the documents in memory.
+
+    The names are given up front, then each document is added in the same
+    order, and ``commit`` fills in the offset table and moves the store into
+    place, see ``StagedFile``.  Leaving the ``with`` block without committing
+    throws the new store away.
+
+    Args:
+        store_file: The store to write.
+        names: The glyph names, in the order to store them.
+
+    Raises:
+        ValueError: If a name is empty or contains a newline.
+    """
+
+    def __init__(self, store_file: Path, names: Sequence[str]):
+        for name in names:
+            if not name or "\n" in name:
+                raise ValueError(f"Can't store a glyph named {name!r}.")
+        names_block = "\n".join(names).encode("utf-8")
+        self._count = len(names)
+        self._table = bytearray()
+        self._offset = _HEADER.size + _ENTRY.size * self._count + len(names_block)
+        self._staged = StagedFile(store_file)
+        file = self._staged.file
+        file.write(_HEADER.pack(MAGIC, STORE_VERSION, self._count, len(names_block)))
+        # Placeholder for the table, written once the offsets are known.
+        file.write(bytes(_ENTRY.size * self._count))
+        file.write(names_block)
+
+    def add(self, document: bytes) -> None:
+        """
+        Write the document of the next glyph.
+
+        Raises:
+            ValueError: If every glyph already has its document.
+        """
+        if len(self._table) == _ENTRY.size * self._count:
+            raise ValueError("The store already has a document for every glyph.")
+        self._table += _ENTRY.pack(self._offset, len(document))
+        self._staged.file.write(document)
+        self._offset += len(document)
+
+    def commit(self) -> bool:
+        """
+        Finish the store and move it into place.
+
+        Returns:
+            Whether the store was written, see ``StagedFile.commit``.
+
+        Raises:
+            ValueError: If some glyphs have no document.
+        """
+        if len(self._table) != _ENTRY.size * self._count:
+            raise ValueError(
+                f"Only {len(self._table) // _ENTRY.size} of {self._count} glyphs "
+                "have a document."
+            )
+        self._staged.file.seek(_HEADER.size)
+        self._staged.file.write(self._table)
+        return self._staged.commit()
+
+    def __enter__(self) -> "StoreWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._staged.abort()
+
+
+class GlyphStore:
+    """
+    A glyph store file, memory-mapped so only the entries that are read get
+    paged in.  Entries are read by position or by name.
+
+    Raises:
+        ValueError: If the file isn't a glyph store of this version.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, names_size = _HEADER.unpack_from(self._map)
+            if magic != MAGIC or version != STORE_VERSION:
+                raise ValueError(
+                    f"{path} is not a version {STORE_VERSION} glyph store."
+                )
+            table_end = _HEADER.size + _ENTRY.size * count
+            self._entries = list(
+                _ENTRY.iter_unpack(self._map[_HEADER.size : table_end])
+            )
+            names_block = self._map[table_end : table_end + names_size]
+        except struct.error as error:
+            self.close()
+            raise ValueError(f"{path} is not a glyph store.") from error
+        except ValueError:
+            self.close()
+            raise
+        self.names = names_block.decode("utf-8").split("\n") if count else []
+        self._index = {name: index for index, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def position(self, name: str) -> int:
+        """
+        Get the position of a glyph in the store.
+
+        Raises:
+            KeyError: If there's no glyph with that name.
+        """
+        return self._index[name]
+
+    def read(self, index: int) -> bytes:
+        """
+        Get the SVG document at a position in the store.
+        """
+        offset, length = self._entries[index]
+        return self._map[offset : offset + length]
+
+    def __getitem__(self, name: str) -> bytes:
+        return self.read(self.position(name))
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "GlyphStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+def stored_names(store_file: Path) -> set[str]:
+    """
+    Get the names of the glyphs in a store, or none if there's no valid store.
+    """
+    try:
+        with GlyphStore(store_file) as store:
+            return set(store.names)
+    except (FileNotFoundError, ValueError):
+        return set()
+
+
+def unpack(
+    store_file: Path,
+    output_dir: Path,
+    writers: int = WRITER_THREADS,
+    report: Optional[OutputReport] = None,
+) -> list[Path]:
+    """
+    Write every glyph in a store to a loose SVG under ``output_dir``, at the
+    same relative path the loose build would have written it to.
+
+    Args:
+        store_file: The glyph store to unpack.
+        output_dir: The directory to write the SVGs under.
+        writers: Number of threads writing the SVGs.
+        report: Records which SVGs were written and which were unchanged.
+
+    Returns:
+        The paths of the SVGs, in store order.
+    """
+    paths = []
+    with (
+        GlyphStore(store_file) as store,
+        BackgroundWriter(writers, report=report) as writer,
+    ):
+        for index, name in enumerate(store.names):
+            output_file = output_dir / name
+            writer.submit(output_file, store.read(index))
+            paths.append(output_file)
+    return paths
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(description="Unpack a glyph store into loose SVGs.")
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=RAW_DIR / STORE_NAME,
+        help="The glyph store to unpack (default: the one in the build directory).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=RAW_DIR,
+        help="The directory to write the SVGs under (default: the build directory).",
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=WRITER_THREADS,
+        help=f"Number of threads writing the SVGs (default: {WRITER_THREADS}).",
+    )
+    args = parser.parse_args(argv)
+    report = OutputReport()
+
+    paths = unpack(args.store, args.output, args.writers, report)
+    print(f"Unpacked {len(paths)} glyphs.")
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
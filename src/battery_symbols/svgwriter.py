@@ -0,0 +1,220 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import skia
+
+from battery_symbols.config import SVG_PRECISION
+from battery_symbols.output import write_if_changed
+from battery_symbols.paths import CUBIC, LINE, MOVE, QUAD
+from battery_symbols.pens import as_path
+from battery_symbols.ttglyph import CONIC, VERB_POINTS, conics_to_quads, path_arrays
+
+_EVEN_ODD = {skia.PathFillType.kEvenOdd, skia.PathFillType.kInverseEvenOdd}
+# Applied to space-terminated numbers that all have a decimal point.
+_TRAILING_ZEROS = re.compile(r"\.?0+ ")
+_NEGATIVE_ZERO = re.compile(r"(?<![^ ])-0 ")
+# Distinct paths whose SVG data is kept, a few times what one build matrix has.
+PATH_DATA_CACHE_SIZE = 4096
+
+
+def format_number(value: float, precision: int = SVG_PRECISION) -> str:
+    """
+    Format a coordinate with at most ``precision`` decimal places and no
+    trailing zeros.
+    """
+    text = f"{value:.{precision}f}"
+    if precision:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def fill_path(
+    shape: skia.Path | skia.RRect | skia.Rect, paint: skia.Paint
+) -> skia.Path:
+    """
+    Get the area an element covers, turning strokes into their outline.
+    """
+    path = as_path(shape)
+    if paint.getStyle() == skia.Paint.kFill_Style:
+        return path
+    fill = skia.Path()
+    paint.getFillPath(path, fill)
+    return fill
+
+
+def _format_all(values: npt.NDArray[np.float64], precision: int) -> list[str]:
+    """
+    Format every value like ``format_number`` does, in one string operation.
+    """
+    if not len(values):
+        return []
+    text = (f"%.{precision}f " * len(values)) % tuple(values.tolist())
+    if precision:
+        text = _TRAILING_ZEROS.sub(" ", text)
+    return _NEGATIVE_ZERO.sub("0 ", text).split()
+
+
+@lru_cache(maxsize=PATH_DATA_CACHE_SIZE)
+def _path_data(data: bytes, precision: int) -> str:
+    """
+    Write the SVG ``d`` attribute of a serialized path the way ``SVGPathPen``
+    does when the path is replayed through ``pens.draw_skia_path``, character
+    for character, but with array operations over the whole path instead of a
+    pen call per segment and a ``format_number`` call per coordinate.
+
+    The cases, anodes and bolts are the same path for every level, so they are
+    only written once per process.
+
+    Conics are flattened with ``ttglyph.conics_to_quads``.  Lines to the
+    current point are dropped, horizontal and vertical lines use ``H`` and
+    ``V``, and lines right after a move (or after another such line) leave out
+    the command letter.
+    """
+    path = skia.Path()
+    path.readFromMemory(data)
+    verbs, points, weights = path_arrays(path)
+    taken = VERB_POINTS[verbs]
+    first = np.cumsum(taken) - taken  # each verb's first point
+
+    # Every conic turns into a run of quads, every other verb into one command.
+    conic_verbs = np.flatnonzero(verbs == CONIC)
+    conic_first = first[conic_verbs]
+    quads, quad_points = conics_to_quads(
+        np.stack(
+            [points[conic_first - 1], points[conic_first], points[conic_first + 1]],
+            axis=1,
+        ),
+        weights,
+    )
+    commands_per_verb = np.ones(len(verbs), dtype=np.int64)
+    commands_per_verb[conic_verbs] = quad_points // 2
+    command_start = np.cumsum(commands_per_verb) - commands_per_verb
+    kinds = np.repeat(verbs, commands_per_verb)
+    kinds[kinds == CONIC] = QUAD
+
+    # Up to three points per command, NaN where a command has fewer.
+    command_points = np.full((len(kinds), 3, 2), np.nan, dtype=np.float32)
+    for count, selected in (
+        (1, (verbs == MOVE) | (verbs == LINE)),
+        (2, verbs == QUAD),
+        (3, verbs == CUBIC),
+    ):
+        index = np.flatnonzero(selected)
+        for i in range(count):
+            command_points[command_start[index], i] = points[first[index] + i]
+    conic_counts = commands_per_verb[conic_verbs]
+    conic_commands = np.arange(len(quads) // 2) + np.repeat(
+        command_start[conic_verbs] - (np.cumsum(conic_counts) - conic_counts),
+        conic_counts,
+    )
+    command_points[conic_commands, :2] = quads.reshape(-1, 2, 2)
+
+    # The point each command starts from.  Only a move follows a close, and a
+    # move doesn't depend on it.
+    last = np.array([1, 1, 2, 2, 3, 1, 1])[kinds] - 1
+    ends = command_points[np.arange(len(kinds)), last]
+    current = np.concatenate([np.full((1, 2), np.nan, np.float32), ends[:-1]])
+
+    x, y = command_points[:, 0, 0], command_points[:, 0, 1]
+    lines = kinds == LINE
+    repeated = lines & (x == current[:, 0]) & (y == current[:, 1])
+    vertical = lines & ~repeated & (x == current[:, 0])
+    horizontal = lines & ~repeated & ~vertical & (y == current[:, 1])
+    plain = lines & ~repeated & ~vertical & ~horizontal
+    # A plain line leaves out its command letter if the last command that
+    # wrote one was a move.
+    changes = np.where(~(repeated | plain), np.arange(len(kinds)), 0)
+    previous = np.concatenate([[0], np.maximum.accumulate(changes)[:-1]])
+    after_move = plain & (kinds[previous] == MOVE)
+
+    letters = np.array(["M", "L", "Q", "", "C", "Z", ""], dtype=object)[kinds]
+    letters[repeated] = ""
+    letters[vertical] = "V"
+    letters[horizontal] = "H"
+    letters[after_move] = " "
+
+    coordinates = command_points.reshape(len(kinds), 6).astype(np.float64)
+    coordinates[repeated] = np.nan
+    coordinates[vertical, 0] = coordinates[vertical, 1]
+    coordinates[vertical | horizontal, 1] = np.nan
+    present = ~np.isnan(coordinates)
+    text = np.full(coordinates.shape, "", dtype=object)
+    text[present] = _format_all(coordinates[present], precision)
+    text[:, 1:][present[:, 1:]] = [
+        " " + number for number in text[:, 1:][present[:, 1:]].tolist()
+    ]
+    return "".join(np.column_stack([letters, text]).ravel().tolist())
+
+
+def clear_cache() -> None:
+    """
+    Forget the path data written so far, e.g. to time a cold start.
+    """
+    _path_data.cache_clear()
+
+
+def _path_element(path: skia.Path, precision: int) -> str:
+    fill_rule = ' fill-rule="evenodd"' if path.getFillType() in _EVEN_ODD else ""
+    data = _path_data(bytes(path.serialize()), precision)
+    return f'<path d="{data}"{fill_rule}/>'
+
+
+def render_svg(
+    elements: list[tuple[skia.Path, skia.Paint]],
+    width: float,
+    height: float,
+    precision: int = SVG_PRECISION,
+    merge: bool = False,
+) -> bytes:
+    """
+    Serialize a battery's elements as a minimal SVG: one path per element,
+    with the coordinates rounded to ``precision`` decimal places.
+
+    Args:
+        elements: The (shape, paint) pairs assembled by a Battery.
+        width: The SVG width.
+        height: The SVG height.
+        precision: Decimal places kept in coordinates.
+        merge: Union every element into a single path instead.
+
+    Returns:
+        The SVG document.
+    """
+    paths = [fill_path(shape, paint) for shape, paint in elements]
+    if merge and paths:
+        builder = skia.OpBuilder()
+        for path in paths:
+            builder.add(path, skia.PathOp.kUnion_PathOp)
+        paths = [builder.resolve()]
+
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{format_number(width, precision)}" '
+        f'height="{format_number(height, precision)}">'
+    ]
+    parts.extend(_path_element(path, precision) for path in paths)
+    parts.append("</svg>\n")
+    # Build the whole document first so it goes out in a single write.
+    return "".join(parts).encode("utf-8")
+
+
+def write_svg(
+    elements: list[tuple[skia.Path, skia.Paint]],
+    width: float,
+    height: float,
+    output_file: Path,
+    precision: int = SVG_PRECISION,
+    merge: bool = False,
+) -> bool:
+    """
+    Write a battery's elements as a minimal SVG, see ``render_svg``.
+
+    Returns:
+        Whether the file was written, it's left alone if it already holds the
+        same SVG.
+    """
+    data = render_svg(elements, width, height, precision, merge)
+    return write_if_changed(output_file, data)
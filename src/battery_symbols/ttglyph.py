@@ -0,0 +1,430 @@
+from array import array
+from collections.abc import Iterable
+from struct import calcsize, unpack_from
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+import skia
+from fontTools.cu2qu import curve_to_quadratic
+from fontTools.ttLib.tables._g_l_y_f import Glyph, GlyphCoordinates
+from fontTools.ttLib.tables.ttProgram import Program
+
+from battery_symbols.paths import CLOSE, CUBIC, LINE, MOVE, QUAD
+from battery_symbols.pens import CONIC_TOLERANCE, MAX_CONIC_TO_QUAD_POW2
+
+# Builds TrueType glyphs from skia paths with whole-array operations instead
+# of replaying every segment through RecordingPen, BoundsPen, TransformPen and
+# TTGlyphPen.  The results match what those pens produce from the same paths
+# (with conics flattened like ``pens.draw_skia_path`` does), coordinate for
+# coordinate, except that cubics become quadratic splines instead of the cubic
+# points TTGlyphPen would write.
+
+CONIC = int(skia.Path.kConic_Verb)
+
+# Points each verb takes from skia's point array, indexed by verb.
+VERB_POINTS = np.array([1, 1, 2, 2, 3, 0, 0])
+
+# path_arrays reads SkPath::writeToMemory's layout, which is private to skia:
+# a header of (version | serialization type << 28, point count, weight count,
+# verb count), then the points, weights and verbs.  It's the layout of
+# version 5, which the skia-python versions pinned in pyproject.toml write.
+# Anything else, including the rounded rects and ovals written as the shape
+# rather than their verbs and points, is read one verb at a time instead.
+_SERIALIZATION_VERSION = 5
+_SERIALIZATION_VERSION_MASK = 0xFF
+_SERIALIZATION_TYPE_SHIFT = 28
+_GENERAL_SERIALIZATION = 0
+_HEADER = "<4i"
+
+# Maximum distance from a cubic to its quadratic approximation, in path units.
+CUBIC_TOLERANCE = 1 / 64
+
+# (xx, xy, yx, yy, dx, dy), as used by fontTools' Transform
+Transform = tuple[float, float, float, float, float, float]
+
+PointArray = npt.NDArray[np.float32]
+
+
+def path_arrays(
+    path: skia.Path,
+) -> tuple[npt.NDArray[np.uint8], PointArray, npt.NDArray[np.float32]]:
+    """
+    Get a path's verbs, points and conic weights as arrays, from its
+    serialized form rather than one verb at a time when skia writes the
+    layout this reads.
+
+    Returns:
+        tuple of (verbs, (N, 2) points, conic weights)
+    """
+    data = bytes(path.serialize())
+    packed, point_count, weight_count, verb_count = unpack_from(_HEADER, data)
+    offset = calcsize(_HEADER)
+    size = offset + point_count * 8 + weight_count * 4 + verb_count
+    if (
+        packed & _SERIALIZATION_VERSION_MASK != _SERIALIZATION_VERSION
+        or packed >> _SERIALIZATION_TYPE_SHIFT != _GENERAL_SERIALIZATION
+        or not size <= len(data) < size + 4
+    ):
+        return _iterated_arrays(path)
+
+    points = np.frombuffer(data, np.float32, point_count * 2, offset).reshape(-1, 2)
+    offset += points.nbytes
+    weights = np.frombuffer(data, np.float32, weight_count, offset)
+    offset += weights.nbytes
+    verbs = np.frombuffer(data, np.uint8, verb_count, offset)
+    return verbs, points, weights
+
+
+def _iterated_arrays(
+    path: skia.Path,
+) -> tuple[npt.NDArray[np.uint8], PointArray, npt.NDArray[np.float32]]:
+    """
+    ``path_arrays`` one verb at a time, the way ``pens.draw_skia_path`` reads
+    a path.
+    """
+    verbs = []
+    weights = []
+    iterator = skia.Path.RawIter(path)
+    while True:
+        verb, _points = iterator.next()
+        if verb == skia.Path.kDone_Verb:
+            break
+        verbs.append(int(verb))
+        if verb == skia.Path.kConic_Verb:
+            weights.append(iterator.conicWeight())
+    points = np.array(
+        [(point.x(), point.y()) for point in path.getPoints(path.countPoints())],
+        dtype=np.float32,
+    ).reshape(-1, 2)
+    return (
+        np.array(verbs, dtype=np.uint8),
+        points,
+        np.array(weights, dtype=np.float32),
+    )
+
+
+def _drop_repeated_lines(
+    verbs: npt.NDArray[np.uint8], points: PointArray, weights: npt.NDArray[np.float32]
+) -> tuple[npt.NDArray[np.uint8], PointArray, npt.NDArray[np.float32]]:
+    """
+    Leave out the lines to the current point, like ``SVGPathPen`` does.
+    """
+    taken = VERB_POINTS[verbs]
+    first = np.cumsum(taken) - taken
+    # skia starts every contour with a move, so a line always has a point
+    # before it.
+    lines = np.flatnonzero(verbs == LINE)
+    repeated = lines[np.all(points[first[lines]] == points[first[lines] - 1], axis=1)]
+    if not len(repeated):
+        return verbs, points, weights
+    return (
+        np.delete(verbs, repeated),
+        np.delete(points, first[repeated], axis=0),
+        weights,
+    )
+
+
+def round_like_text(
+    values: npt.NDArray[np.float64], precision: int
+) -> npt.NDArray[np.float64]:
+    """
+    Round values to what they read back as once written with ``precision``
+    decimal places, which plain binary rounding doesn't always match.
+    """
+    if not values.size:
+        return values
+    text = (f"%.{precision}f " * values.size) % tuple(values.ravel().tolist())
+    return np.array(text.split(), dtype=np.float64).reshape(values.shape)
+
+
+def conic_quad_pow2(
+    p0: PointArray, p1: PointArray, p2: PointArray, weights: npt.NDArray[np.float32]
+) -> npt.NDArray[np.int64]:
+    """
+    Vectorized ``pens._conic_quad_pow2``: how many quads (as a power of two)
+    each conic needs to stay within CONIC_TOLERANCE.
+    """
+    a = weights.astype(np.float64) - 1
+    k = a / (4 * (2 + a))
+    d = (p0.astype(np.float64) - 2 * p1.astype(np.float64)) + p2
+    error = np.sqrt((k * d[:, 0]) ** 2 + (k * d[:, 1]) ** 2)
+    pow2 = np.zeros(len(weights), dtype=np.int64)
+    for _ in range(MAX_CONIC_TO_QUAD_POW2):
+        over = error > CONIC_TOLERANCE
+        error = np.where(over, error * 0.25, error)
+        pow2 += over
+    return pow2
+
+
+def _between(a: PointArray, b: PointArray, c: PointArray) -> npt.NDArray[np.bool_]:
+    return (a - b) * (c - b) <= 0
+
+
+def _chop(
+    conics: PointArray, weights: npt.NDArray[np.float32], keep_y_order: bool = True
+) -> tuple[PointArray, npt.NDArray[np.float32]]:
+    """
+    Split (K, 3, 2) conics in half, in single precision like ``SkConic::chop``.
+
+    With ``keep_y_order``, conics that are monotonic in y stay monotonic, the
+    way skia's ``subdivide`` adjusts them.
+
+    Returns:
+        tuple of ((2K, 3, 2) halves, their weights), each conic's halves next
+        to each other.
+    """
+    p0, p1, p2 = conics[:, 0], conics[:, 1], conics[:, 2]
+    w = weights[:, None]
+    scale = np.float32(1) / (np.float32(1) + w)
+    wp1 = w * p1
+    mid = (p0 + (wp1 + wp1) + p2) * scale * np.float32(0.5)
+    halves = np.stack(
+        [p0, (p0 + wp1) * scale, mid, mid, (wp1 + p2) * scale, p2], axis=1
+    )
+
+    if keep_y_order:
+        start_y, end_y = p0[:, 1], p2[:, 1]
+        monotonic = _between(start_y, p1[:, 1], end_y)
+        mid_y = halves[:, 2, 1]
+        closer_y = np.where(
+            np.abs(mid_y - start_y) < np.abs(mid_y - end_y), start_y, end_y
+        )
+        mid_y = np.where(monotonic & ~_between(start_y, mid_y, end_y), closer_y, mid_y)
+        halves[:, 2, 1] = halves[:, 3, 1] = mid_y
+        halves[:, 1, 1] = np.where(
+            monotonic & ~_between(start_y, halves[:, 1, 1], mid_y),
+            start_y,
+            halves[:, 1, 1],
+        )
+        halves[:, 4, 1] = np.where(
+            monotonic & ~_between(mid_y, halves[:, 4, 1], end_y),
+            end_y,
+            halves[:, 4, 1],
+        )
+
+    new_weights = np.sqrt(np.float32(0.5) + weights * np.float32(0.5))
+    return halves.reshape(-1, 3, 2), np.repeat(new_weights, 2)
+
+
+def conics_to_quads(
+    conics: PointArray, weights: npt.NDArray[np.float32]
+) -> tuple[PointArray, npt.NDArray[np.int64]]:
+    """
+    Flatten (K, 3, 2) conics into quadratic curves, the same way (and to the
+    same single precision coordinates) as ``skia.Path.ConvertConicToQuads``.
+
+    Returns:
+        tuple of (the control and end point of every quad, in order, and the
+        number of points each conic turned into)
+    """
+    pow2 = conic_quad_pow2(conics[:, 0], conics[:, 1], conics[:, 2], weights)
+    counts = 2 << pow2
+    # When the first split of a heavily subdivided conic turns out to be a
+    # pair of lines, skia emits just those two lines.
+    lines = np.zeros(len(weights), dtype=bool)
+    deepest = np.flatnonzero(pow2 == MAX_CONIC_TO_QUAD_POW2)
+    if len(deepest):
+        halves, _ = _chop(conics[deepest], weights[deepest], keep_y_order=False)
+        first, second = halves[0::2], halves[1::2]
+        lines[deepest] = np.all(first[:, 1] == first[:, 2], axis=1) & np.all(
+            second[:, 0] == second[:, 1], axis=1
+        )
+        counts[lines] = 4
+
+    quads = np.empty((int(counts.sum()), 2), dtype=np.float32)
+    offsets = np.cumsum(counts) - counts
+    for level in range(MAX_CONIC_TO_QUAD_POW2 + 1):
+        selected = np.flatnonzero((pow2 == level) & ~lines)
+        if not len(selected):
+            continue
+        parts, part_weights = conics[selected], weights[selected]
+        for _ in range(level):
+            parts, part_weights = _chop(parts, part_weights)
+        per_conic = 2 << level
+        index = offsets[selected, None] + np.arange(per_conic)
+        quads[index.ravel()] = parts[:, 1:].reshape(-1, 2)
+
+    selected = np.flatnonzero(lines)
+    if len(selected):
+        halves, _ = _chop(conics[selected], weights[selected], keep_y_order=False)
+        control, end = halves[0::2, 1], halves[1::2, 2]
+        index = offsets[selected, None] + np.arange(4)
+        quads[index.ravel()] = np.stack(
+            [control, control, control, end], axis=1
+        ).reshape(-1, 2)
+    return quads, counts
+
+
+def _cubics_to_quads(
+    cubics: PointArray,
+) -> tuple[list[npt.NDArray[np.float64]], npt.NDArray[np.int64]]:
+    """
+    Approximate (K, 4, 2) cubics with quadratic splines (implied on-curve
+    points left out) within CUBIC_TOLERANCE.
+
+    Unlike the rest of this module this isn't vectorized: it calls
+    ``curve_to_quadratic`` once per cubic, since the number of quadratics
+    each one needs varies.  None of the current glyphs have cubics (the
+    number style's text is already quadratic), so it rarely runs.
+    """
+    splines = [
+        np.array(curve_to_quadratic(cubic.tolist(), CUBIC_TOLERANCE)[1:])
+        for cubic in cubics.astype(np.float64)
+    ]
+    return splines, np.array([len(spline) for spline in splines], dtype=np.int64)
+
+
+class QuadraticOutline:
+    """
+    A glyph outline as TrueType quadratic contours held in arrays: every
+    point, whether it's on the curve, and where each contour starts.
+    """
+
+    def __init__(
+        self,
+        points: npt.NDArray[np.float64],
+        on_curve: npt.NDArray[np.bool_],
+        starts: npt.NDArray[np.int64],
+    ):
+        self.points = points
+        self.on_curve = on_curve
+        self.starts = starts
+
+    @classmethod
+    def from_paths(
+        cls, paths: Iterable[skia.Path], precision: Optional[int] = None
+    ) -> "QuadraticOutline":
+        """
+        Convert skia paths into one outline, in a handful of array operations
+        per path rather than a pen call per segment.
+
+        Args:
+            paths: The paths to convert.
+            precision: Build the outline that's read back from the SVG the
+                glyph SVG writer writes at this many decimal places (see
+                ``svgwriter``) instead: lines to the current point are dropped
+                and the coordinates are rounded the same way.
+        """
+        arrays = [path_arrays(path) for path in paths]
+        if precision is not None:
+            arrays = [_drop_repeated_lines(*path) for path in arrays]
+        verbs = np.concatenate([v for v, _, _ in arrays] or [np.empty(0, np.uint8)])
+        points = np.concatenate(
+            [p for _, p, _ in arrays] or [np.empty((0, 2), np.float32)]
+        )
+        weights = np.concatenate([w for _, _, w in arrays] or [np.empty(0, np.float32)])
+
+        taken = VERB_POINTS[verbs]
+        first = np.cumsum(taken) - taken  # each verb's first point
+        counts = taken.copy()  # points each verb adds to the outline
+        counts[verbs == CLOSE] = 0
+
+        conic_verbs = np.flatnonzero(verbs == CONIC)
+        conic_first = first[conic_verbs]
+        conics = np.stack(
+            [points[conic_first - 1], points[conic_first], points[conic_first + 1]],
+            axis=1,
+        )
+        conic_points, counts[conic_verbs] = conics_to_quads(conics, weights)
+
+        cubic_verbs = np.flatnonzero(verbs == CUBIC)
+        cubic_first = first[cubic_verbs]
+        cubics = np.stack(
+            [points[cubic_first - 1 + i] for i in range(4)], axis=1
+        ).reshape(-1, 4, 2)
+        splines, counts[cubic_verbs] = _cubics_to_quads(cubics)
+
+        offsets = np.cumsum(counts) - counts
+        out = np.empty((int(counts.sum()), 2), dtype=np.float64)
+        on_curve = np.zeros(len(out), dtype=bool)
+
+        simple = np.flatnonzero((verbs == MOVE) | (verbs == LINE))
+        out[offsets[simple]] = points[first[simple]]
+        on_curve[offsets[simple]] = True
+
+        quad_verbs = np.flatnonzero(verbs == QUAD)
+        out[offsets[quad_verbs]] = points[first[quad_verbs]]
+        out[offsets[quad_verbs] + 1] = points[first[quad_verbs] + 1]
+        on_curve[offsets[quad_verbs] + 1] = True
+
+        conic_counts = counts[conic_verbs]
+        shift = offsets[conic_verbs] - (np.cumsum(conic_counts) - conic_counts)
+        index = np.arange(len(conic_points)) + np.repeat(shift, conic_counts)
+        out[index] = conic_points
+        on_curve[index[1::2]] = True
+
+        for offset, spline in zip(offsets[cubic_verbs], splines, strict=True):
+            out[offset : offset + len(spline)] = spline
+            on_curve[offset + len(spline) - 1] = True
+
+        if precision is not None:
+            out = round_like_text(out, precision)
+        return cls(out, on_curve, offsets[verbs == MOVE])
+
+    @property
+    def bounds(self) -> Optional[tuple[float, float, float, float]]:
+        """
+        The bounds of the outline, including curve extrema, as BoundsPen
+        measures them.
+        """
+        if not len(self.points):
+            return None
+        points, on_curve = self.points, self.on_curve
+        off = np.flatnonzero(~on_curve)
+        # Every quad's start and end, including the on-curve points implied
+        # between two off-curve points.
+        before = np.where(
+            on_curve[off - 1, None],
+            points[off - 1],
+            (points[off - 1] + points[off]) * 0.5,
+        )
+        after = np.where(
+            on_curve[off + 1, None],
+            points[off + 1],
+            (points[off] + points[off + 1]) * 0.5,
+        )
+
+        b = (points[off] - before) * 2.0
+        a = after - before - b
+        a2 = a * 2.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roots = np.where(a2 != 0, -b / a2, -1.0)
+        extrema = [points[on_curve], before, after]
+        for axis in (0, 1):
+            t = roots[:, axis, None]
+            inside = (t[:, 0] >= 0) & (t[:, 0] < 1)
+            extrema.append((a * t * t + b * t + before)[inside])
+        candidates = np.concatenate(extrema)
+        x_min, y_min = candidates.min(axis=0)
+        x_max, y_max = candidates.max(axis=0)
+        return float(x_min), float(y_min), float(x_max), float(y_max)
+
+    def glyph(self, transform: Transform) -> Glyph:
+        """
+        Build the TrueType glyph of the outline, transformed and rounded to
+        integer coordinates.
+
+        Like TTGlyphPen, single point contours are dropped, and so is a
+        contour's last point when it repeats the first.
+        """
+        xx, xy, yx, yy, dx, dy = transform
+        x, y = self.points[:, 0], self.points[:, 1]
+        points = np.stack([xx * x + yx * y + dx, xy * x + yy * y + dy], axis=1)
+
+        ends = np.append(self.starts[1:], len(points)) - 1
+        keep = np.ones(len(points), dtype=bool)
+        single = ends == self.starts
+        keep[self.starts[single]] = False
+        repeated = ~single & np.all(points[self.starts] == points[ends], axis=1)
+        keep[ends[repeated]] = False
+        lengths = ends - self.starts + 1 - single - repeated
+
+        glyph = Glyph()
+        glyph.coordinates = GlyphCoordinates(np.floor(points[keep] + 0.5).tolist())
+        glyph.flags = array("B", self.on_curve[keep].astype(np.uint8).tobytes())
+        glyph.endPtsOfContours = (np.cumsum(lengths[~single]) - 1).tolist()
+        glyph.numberOfContours = len(glyph.endPtsOfContours)
+        glyph.program = Program()
+        glyph.program.fromBytecode(b"")
+        return glyph
@@ -0,0 +1,282 @@
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.ttLib.tables._g_l_y_f import Glyph, GlyphCoordinates, flagOnCurve
+from fontTools.ttLib.tables.TupleVariation import TupleVariation
+from fontTools.varLib.featureVars import addFeatureVariations
+from fontTools.varLib.models import VariationModel
+
+from battery_symbols.config import FONTS_DIR
+from battery_symbols.create import (
+    ADV_WIDTH,
+    EM_SIZE,
+    LSB,
+    battery_glyph,
+    setup_tables,
+)
+from battery_symbols.generate import (
+    BATTERY_STYLES,
+    BuildMatrix,
+    glyph_jobs,
+    glyph_name,
+    make_battery,
+)
+from battery_symbols.output import OutputReport, save_font
+from battery_symbols.profiling import StageProfiler
+from battery_symbols.runtime import LEVELS, codepoint
+
+AXIS_TAG = "LEVL"
+# How far (in font units) an interpolated level may be from the discrete glyph.
+TOLERANCE = 1
+# Levels below the lowest master are only approximated (the fill's corner
+# radii get clamped at small widths) and are swapped for their discrete
+# glyphs, so a style has to interpolate exactly from this level up to be made
+# variable.
+MAX_THRESHOLD = 20
+# The glyphs that vary only by moving points: the discharging simple battery.
+VARIABLE_STYLES = (0,)
+VARIABLE_STATES = (False,)
+
+
+def _normalize(level: float) -> float:
+    """Map a level to the normalized axis range, where the default (full) is 0."""
+    return (level - LEVELS[-1]) / (LEVELS[-1] - LEVELS[0])
+
+
+def _structure(glyph: Glyph) -> tuple[int, tuple[int, ...], tuple[int, ...]]:
+    """Everything that has to match for two glyphs to be interpolated."""
+    return (
+        glyph.numberOfContours,
+        tuple(glyph.endPtsOfContours),
+        tuple(flag & flagOnCurve for flag in glyph.flags),
+    )
+
+
+def _collapse(
+    coordinates: GlyphCoordinates, glyph: Glyph, moving: set[int]
+) -> GlyphCoordinates:
+    """
+    Squash every contour with a moving point to zero width at its left edge.
+    """
+    collapsed = GlyphCoordinates(coordinates)
+    start = 0
+    for end in glyph.endPtsOfContours:
+        indices = range(start, end + 1)
+        if moving.intersection(indices):
+            left = min(collapsed[i][0] for i in indices)
+            for i in indices:
+                collapsed[i] = (left, collapsed[i][1])
+        start = end + 1
+    return collapsed
+
+
+def _interpolate(
+    glyphs: dict[int, Glyph], threshold: int
+) -> Optional[list[TupleVariation]]:
+    """
+    Build the variations for masters at ``threshold`` and full, if they
+    reproduce every level in between.
+    """
+    full = LEVELS[-1]
+    default = glyphs[full].coordinates
+    low = glyphs[threshold].coordinates
+    moving = {i for i, (a, b) in enumerate(zip(default, low, strict=True)) if a != b}
+    model = VariationModel(
+        [{}, {AXIS_TAG: _normalize(threshold)}, {AXIS_TAG: -1.0}], [AXIS_TAG]
+    )
+    # getDeltas subtracts in place, so it gets copies of the glyph coordinates.
+    deltas = model.getDeltas(
+        [
+            GlyphCoordinates(default),
+            GlyphCoordinates(low),
+            _collapse(low, glyphs[full], moving),
+        ],
+        round=round,
+    )
+
+    for level in range(threshold, full + 1):
+        interpolated = model.interpolateFromDeltas(
+            {AXIS_TAG: _normalize(level)}, deltas
+        )
+        for (x, y), (x2, y2) in zip(
+            interpolated, glyphs[level].coordinates, strict=True
+        ):
+            if abs(x - x2) > TOLERANCE or abs(y - y2) > TOLERANCE:
+                return None
+
+    phantom_points = [(0, 0)] * 4
+    return [
+        TupleVariation(support, [tuple(point) for point in delta] + phantom_points)
+        for delta, support in zip(deltas[1:], model.supports[1:], strict=True)
+    ]
+
+
+def variable_glyph(
+    glyphs: dict[int, Glyph], hmtx: dict[int, tuple[int, int]]
+) -> Optional[tuple[Glyph, list[TupleVariation], int]]:
+    """
+    Turn the discrete levels of one style and charge state into a single glyph
+    with a level axis.
+
+    The full glyph is the default.  A second master sits at the lowest level
+    (up to ``MAX_THRESHOLD``) from which interpolating up to full reproduces
+    every discrete level.  Below that level the changing contours shrink
+    linearly to zero width at a third master, level 0, which only
+    approximates the discrete glyphs, see ``level_substitutions``.
+
+    Args:
+        glyphs: The glyph for each level.
+        hmtx: The metrics for each level.
+
+    Returns:
+        tuple of (default glyph, gvar variations, the level of the lowest
+        master), or None when the levels can't be interpolated.
+    """
+    full = LEVELS[-1]
+    default = glyphs[full]
+    if default.numberOfContours <= 0:
+        return None
+
+    # Levels below this have a different outline structure or metrics.
+    lowest = full
+    while (
+        lowest - 1 > LEVELS[0]
+        and _structure(glyphs[lowest - 1]) == _structure(default)
+        and hmtx[lowest - 1] == hmtx[full]
+    ):
+        lowest -= 1
+
+    for threshold in range(lowest, MAX_THRESHOLD + 1):
+        variations = _interpolate(glyphs, threshold)
+        if variations is not None:
+            return default, variations, threshold
+    return None
+
+
+def level_substitutions(
+    name: str, names: dict[int, str], threshold: int
+) -> list[tuple[list[dict[str, tuple[float, float]]], dict[str, str]]]:
+    """
+    Swap a variable glyph for the discrete glyph of each whole level below
+    ``threshold``, which interpolation only approximates.  Each level covers
+    the axis up to half a level either side of it.
+
+    Args:
+        name: The variable glyph.
+        names: The discrete glyph of each level.
+        threshold: The lowest level the glyph interpolates exactly.
+
+    Returns:
+        The conditional substitutions, see
+        ``fontTools.varLib.featureVars.addFeatureVariations``.
+    """
+    return [
+        (
+            [
+                {
+                    AXIS_TAG: (
+                        _normalize(max(level - 0.5, LEVELS[0])),
+                        _normalize(level + 0.5),
+                    )
+                }
+            ],
+            {name: names[level]},
+        )
+        for level in range(LEVELS[0], threshold)
+    ]
+
+
+def build_variable_font(
+    output_file: Path,
+    font_path: Path = FONTS_DIR / "OpenSans-Variable.ttf",
+    profiler: Optional[StageProfiler] = None,
+    report: Optional[OutputReport] = None,
+) -> list[str]:
+    """
+    Create and save a variable TTF with a battery glyph whose fill follows a
+    ``LEVL`` axis from 0 to 100 with a named instance per level.  The glyph is
+    mapped to the codepoint of its full (level 100) discrete glyph, which is
+    also what it shows at the default location, and every other level's
+    discrete glyph is kept at its own codepoint, as in the regular font.
+
+    The levels are always whole percentages at the default case width,
+    whatever the regular font's build matrix is.
+
+    Only the discharging simple battery is built: its levels differ by moving
+    points alone.  The bolt mask and the number's text are cut out of the
+    fill, so they change the outline's structure from level to level, and the
+    other glyphs can't vary.  Levels below the lowest master (see
+    ``variable_glyph``) only approximate their discrete glyphs, so ``rvrn``
+    swaps in the discrete glyph around each of those whole levels.
+
+    Args:
+        output_file: Where to save the font.
+        font_path: The font the number style's text is drawn with.
+        profiler: Times each stage.
+        report: Records whether the font was written.
+
+    Returns:
+        The names of the glyphs with a level axis.
+
+    Raises:
+        ValueError: If the levels can't be interpolated.
+    """
+    profiler = profiler or StageProfiler()
+    report = report or OutputReport()
+    jobs = glyph_jobs(BuildMatrix(styles=VARIABLE_STYLES, states=VARIABLE_STATES))
+    groups: dict[tuple[int, bool], dict[int, Glyph]] = defaultdict(dict)
+    metrics: dict[tuple[int, bool], dict[int, tuple[int, int]]] = defaultdict(dict)
+    names: dict[tuple[int, bool], dict[int, str]] = defaultdict(dict)
+
+    with profiler.stage("variable_draw_glyphs", len(jobs)):
+        for job in jobs:
+            style_index, charge, level, _steps, _width = job
+            glyph, extra_space = battery_glyph(make_battery(job, font_path))
+            groups[style_index, charge][level] = glyph
+            names[style_index, charge][level] = glyph_name(job)
+            metrics[style_index, charge][level] = (ADV_WIDTH, round(extra_space / 2))
+
+    glyf: dict[str, Any] = {".notdef": TTGlyphPen(None).glyph()}
+    hmtx = {".notdef": (ADV_WIDTH, LSB)}
+    cmap = {}
+    variations = {}
+    conditional = []
+    with profiler.stage("variable_interpolate", len(groups)):
+        for (style_index, charge), glyphs in groups.items():
+            style_name = BATTERY_STYLES[style_index][1]
+            name = f"battery_{style_name}_{'charge' if charge else 'discharge'}"
+            result = variable_glyph(glyphs, metrics[style_index, charge])
+            if result is None:
+                raise ValueError(f"The levels of {name} can't be interpolated.")
+            glyf[name], variations[name], threshold = result
+            hmtx[name] = metrics[style_index, charge][LEVELS[-1]]
+            cmap[codepoint(style_index, charge, LEVELS[-1])] = name
+            for level, discrete in names[style_index, charge].items():
+                if level == LEVELS[-1]:
+                    continue
+                glyf[discrete] = glyphs[level]
+                hmtx[discrete] = metrics[style_index, charge][level]
+                cmap[codepoint(style_index, charge, level)] = discrete
+            conditional += level_substitutions(
+                name, names[style_index, charge], threshold
+            )
+
+    with profiler.stage("variable_serialize_font", len(glyf)):
+        fb = FontBuilder(EM_SIZE, isTTF=True)
+        fb.setupGlyphOrder(list(glyf))
+        setup_tables(fb, glyf, hmtx, cmap, "BatterySymbols-Variable")
+        fb.setupFvar(
+            [(AXIS_TAG, LEVELS[0], LEVELS[-1], LEVELS[-1], "Level")],
+            [
+                {"location": {AXIS_TAG: level}, "stylename": f"Level {level}"}
+                for level in LEVELS
+            ],
+        )
+        fb.setupGvar(variations)
+        addFeatureVariations(fb.font, conditional, featureTag="rvrn")
+        written = save_font(fb.font, output_file)
+    report.record(output_file, written, verbose=True)
+    return list(variations)
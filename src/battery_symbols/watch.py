@@ -0,0 +1,314 @@
+import importlib
+import traceback
+from argparse import ArgumentParser
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Optional
+
+from fontTools.ttLib import TTFont
+
+from battery_symbols import cache, create, generate
+from battery_symbols.args import (
+    add_matrix_arguments,
+    matrix_from_args,
+    positive_int,
+)
+from battery_symbols.config import (
+    EXAMPLES_DIR,
+    FONT_FILE,
+    FONTS_DIR,
+    RAW_DIR,
+    SAMPLE_STEP,
+    WATCH_INTERVAL,
+)
+from battery_symbols.output import OutputReport, save_font
+from battery_symbols.profiling import (
+    StageProfiler,
+    add_profile_arguments,
+    profiler_from_args,
+)
+
+# The modules that decide what a glyph looks like and how it's drawn into the
+# font, in the order they have to be reloaded so each one picks up the
+# reloaded versions of the ones before.  They're only used through their
+# modules here, so the watcher always calls the reloaded code.
+RELOAD_ORDER = (
+    "hashing",
+    "paths",
+    "fonts",
+    "pens",
+    "ttglyph",
+    "svgwriter",
+    "models",
+    "cache",
+    "generate",
+    "create",
+)
+
+
+def watched_files() -> list[Path]:
+    """
+    Get the source files and assets that glyphs are rendered from.
+    """
+    sources = [
+        Path(importlib.import_module(f"battery_symbols.{name}").__file__ or "")
+        for name in RELOAD_ORDER
+    ]
+    return sources + sorted(path for path in FONTS_DIR.iterdir() if path.is_file())
+
+
+def _mtimes(paths: list[Path]) -> dict[Path, int]:
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass
+    return mtimes
+
+
+def _style_digests() -> dict[str, str]:
+    return {
+        name: cache.style_digest(battery_class)
+        for battery_class, name in generate.BATTERY_STYLES
+    }
+
+
+def reload_sources() -> None:
+    """
+    Reload every module in ``RELOAD_ORDER``, which also empties their caches.
+    """
+    for name in RELOAD_ORDER:
+        importlib.reload(importlib.import_module(f"battery_symbols.{name}"))
+
+
+class FontPatcher:
+    """
+    Keeps a built font in memory so redrawn glyphs can be swapped into it
+    without compiling the rest of the font again.
+
+    Bounding boxes aren't recalculated on save, since that would expand every
+    glyph.  The patched glyphs get fresh bounds, and the font-wide bounds in
+    ``head`` and limits in ``maxp`` are widened to fit them but never
+    narrowed; a regular build computes them exactly.
+    """
+
+    def __init__(self, font_file: Path):
+        self.font_file = font_file
+        self.font = TTFont(BytesIO(font_file.read_bytes()), recalcBBoxes=False)
+
+    def glyph_names(self) -> set[str]:
+        return set(self.font.getGlyphOrder())
+
+    def patch(self, svg_paths: list[Path]) -> list[str]:
+        """
+        Redraw glyphs from their SVGs and save the font.
+
+        Args:
+            svg_paths: The SVGs to redraw, named after their glyphs.
+
+        Returns:
+            The names of the patched glyphs.
+        """
+        glyf = self.font["glyf"]
+        hmtx = self.font["hmtx"]
+        head = self.font["head"]
+        maxp = self.font["maxp"]
+
+        names = []
+        for svg in svg_paths:
+            glyph, metrics = create.draw_glyph(partial(create.draw_scaled, svg))
+            glyph.recalcBounds(glyf)
+            glyf[svg.stem] = glyph
+            hmtx[svg.stem] = metrics
+            names.append(svg.stem)
+            if glyph.numberOfContours <= 0:
+                continue
+            head.xMin = min(head.xMin, glyph.xMin)
+            head.yMin = min(head.yMin, glyph.yMin)
+            head.xMax = max(head.xMax, glyph.xMax)
+            head.yMax = max(head.yMax, glyph.yMax)
+            maxp.maxPoints = max(maxp.maxPoints, len(glyph.coordinates))
+            maxp.maxContours = max(maxp.maxContours, glyph.numberOfContours)
+
+        written = save_font(self.font, self.font_file)
+        print(
+            f"Wrote {self.font_file}." if written else f"{self.font_file} is unchanged."
+        )
+        return names
+
+
+class Watcher:
+    """
+    Rebuilds the parts of the font and samples that a source or asset change
+    affects, in one long-lived process.
+
+    Only the first update renders with a pool of ``workers``.  After that the
+    changed glyphs are rendered in the watcher's own process, which has the
+    sources loaded already, instead of starting a pool that has to import the
+    render stack again for each change.
+    """
+
+    def __init__(
+        self,
+        font_file: Path = FONT_FILE,
+        workers: Optional[int] = None,
+        sample_step: int = SAMPLE_STEP,
+        profiler: Optional[StageProfiler] = None,
+        matrix: Optional[generate.BuildMatrix] = None,
+        raw_dir: Path = RAW_DIR,
+        examples_dir: Path = EXAMPLES_DIR,
+    ):
+        self.font_file = font_file
+        self.raw_dir = raw_dir
+        self.examples_dir = examples_dir
+        self.workers = workers
+        self.sample_step = sample_step
+        self.profiler = profiler or StageProfiler()
+        self.matrix = matrix or generate.BUILD_MATRIX
+        self.patcher: Optional[FontPatcher] = None
+
+    def _expected_glyph_names(self) -> set[str]:
+        jobs = generate.glyph_jobs(self.matrix)
+        return {".notdef"} | {generate.glyph_name(job) for job in jobs}
+
+    def update(self) -> None:
+        """
+        Render the glyphs that are out of date and bring the font and samples
+        up to date with them.  The font is built from scratch the first time
+        and whenever the glyph set changes, and patched otherwise.  Only the
+        glyphs whose SVGs actually changed are patched.
+        """
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+        report = OutputReport()
+        rendered = generate.generate(
+            self.raw_dir,
+            workers=self.workers if self.patcher is None else 1,
+            profiler=self.profiler,
+            matrix=self.matrix,
+            report=report,
+        )
+        print(f"Rendered {len(rendered)} of {len(self.matrix)} glyphs.")
+        changed = set(report.written)
+        rendered = [svg for svg in rendered if svg in changed]
+
+        if self.patcher is None or not self._expected_glyph_names().issubset(
+            self.patcher.glyph_names()
+        ):
+            create.run_build(
+                self.font_file,
+                profiler=self.profiler,
+                matrix=self.matrix,
+                raw_dir=self.raw_dir,
+            )
+            create.run_samples(
+                self.font_file,
+                self.sample_step,
+                profiler=self.profiler,
+                examples_dir=self.examples_dir,
+            )
+            self.patcher = FontPatcher(self.font_file)
+            return
+        if not rendered:
+            return
+
+        with self.profiler.stage("patch_font", len(rendered)):
+            names = self.patcher.patch(rendered)
+        with self.profiler.stage("samples"):
+            create.extract_and_save_sample_glyphs(
+                self.font_file, self.examples_dir, self.sample_step, names=set(names)
+            )
+
+    def changed(self, paths: list[Path]) -> None:
+        """
+        Reload the sources after ``paths`` changed and update everything that
+        depends on them.  Errors are printed rather than raised, so a typo in
+        the middle of an edit doesn't end the session.
+        """
+        print(f"Changed: {', '.join(path.name for path in paths)}")
+        start = perf_counter()
+        try:
+            before = _style_digests()
+            reload_sources()
+            after = _style_digests()
+            styles = [name for name in after if before.get(name) != after[name]]
+            if styles:
+                print(f"Styles changed: {', '.join(styles)}")
+            self.update()
+        except Exception:
+            traceback.print_exc()
+            return
+        print(f"Updated in {perf_counter() - start:.2f}s.")
+
+    def run(self, interval: float = WATCH_INTERVAL) -> None:
+        """
+        Bring everything up to date, then poll the watched files until
+        interrupted.
+
+        Args:
+            interval: Seconds between polls.
+        """
+        self.update()
+        mtimes = _mtimes(watched_files())
+        print("Watching for changes, press Ctrl+C to stop.")
+        try:
+            while True:
+                sleep(interval)
+                current = _mtimes(watched_files())
+                changed = sorted(
+                    path
+                    for path in mtimes.keys() | current.keys()
+                    if mtimes.get(path) != current.get(path)
+                )
+                mtimes = current
+                if changed:
+                    self.changed(changed)
+        except KeyboardInterrupt:
+            pass
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = ArgumentParser(
+        description="Rebuild the glyphs, font and samples whenever the models or assets change."
+    )
+    parser.add_argument(
+        "--font",
+        type=Path,
+        default=FONT_FILE,
+        help="The font file to keep up to date (default: the font in the project root).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes for the first build (default: CPU count, 1 disables the pool).",
+    )
+    parser.add_argument(
+        "--sample-step",
+        type=positive_int,
+        default=SAMPLE_STEP,
+        help=f"Save a sample SVG for every level that's a multiple of this (default: {SAMPLE_STEP}).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help=f"Seconds between checks for changes (default: {WATCH_INTERVAL}).",
+    )
+    add_matrix_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args)
+    matrix = matrix_from_args(parser, args)
+
+    Watcher(args.font, args.workers, args.sample_step, profiler, matrix).run(
+        args.interval
+    )
+    profiler.write(args.profile_output)
+
+
+if __name__ == "__main__":
+    main()
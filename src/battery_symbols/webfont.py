@@ -0,0 +1,119 @@
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Optional
+
+from fontTools.subset import Options, Subsetter
+from fontTools.ttLib import TTFont
+
+from battery_symbols.output import OutputReport, font_bytes, write_if_changed
+from battery_symbols.runtime import STYLE_NAMES, parse_glyph_name
+
+try:
+    import brotli
+except ImportError:  # the "woff2" extra isn't installed
+    brotli = None
+
+WEB_FLAVORS = ("woff", "woff2")
+
+
+def available_flavors() -> list[str]:
+    """
+    Get the web font flavors that can be written here.  WOFF2 needs brotli.
+    """
+    return [flavor for flavor in WEB_FLAVORS if flavor != "woff2" or brotli]
+
+
+def _save_flavors(
+    font: TTFont, output_stem: Path, report: Optional[OutputReport] = None
+) -> list[Path]:
+    report = report or OutputReport()
+    written = []
+    for flavor in available_flavors():
+        output_file = output_stem.with_name(f"{output_stem.name}.{flavor}")
+        font.flavor = flavor
+        report.record(
+            output_file,
+            write_if_changed(output_file, font_bytes(font)),
+            verbose=True,
+        )
+        written.append(output_file)
+    if brotli is None:
+        print("Skipped WOFF2: install the 'woff2' extra (brotli) to write it.")
+    return written
+
+
+def write_web_fonts(
+    font_file: Path, report: Optional[OutputReport] = None
+) -> list[Path]:
+    """
+    Write WOFF and WOFF2 copies of a font next to it.  They keep the TTF's
+    timestamps, so they're only written again when the TTF changed.
+
+    Args:
+        font_file: The TTF to convert.
+        report: Records which files were written and which were unchanged.
+
+    Returns:
+        The files written.
+    """
+    with TTFont(str(font_file), recalcTimestamp=False) as font:
+        return _save_flavors(font, font_file.with_suffix(""), report)
+
+
+def subset_codepoints(
+    cmap: dict[int, str],
+    styles: Optional[Iterable[str]] = None,
+    level_step: int = 1,
+) -> list[int]:
+    """
+    Get the codepoints in a font's cmap of the given styles, at every case
+    width, for every level that's a whole multiple of ``level_step`` percent.
+
+    Args:
+        cmap: The font's codepoint to glyph name mapping.
+        styles: The style names to keep, all of them if None.
+        level_step: Keep every level that's a multiple of this.
+    """
+    keep = set(STYLE_NAMES if styles is None else styles)
+    codepoints = []
+    for cp, name in cmap.items():
+        parsed = parse_glyph_name(name)
+        if parsed is None:
+            continue
+        style, _width, _state, level = parsed
+        if style in keep and level % level_step == 0:
+            codepoints.append(cp)
+    return codepoints
+
+
+def write_subset_web_fonts(
+    font_file: Path,
+    styles: Optional[Iterable[str]] = None,
+    level_step: int = 1,
+    report: Optional[OutputReport] = None,
+) -> list[Path]:
+    """
+    Write WOFF and WOFF2 fonts next to ``font_file`` that only contain the
+    requested styles and levels, named ``<font>-subset.<flavor>``.
+
+    Args:
+        font_file: The TTF to subset.
+        styles: The style names to keep, all of them if None.
+        level_step: Keep every level that's a multiple of this.
+        report: Records which files were written and which were unchanged.
+
+    Returns:
+        The files written.
+    """
+    options = Options()
+    options.layout_features = []
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    subsetter = Subsetter(options)
+
+    with TTFont(str(font_file), recalcTimestamp=False) as font:
+        cmap = font.getBestCmap()
+        subsetter.populate(unicodes=subset_codepoints(cmap, styles, level_step))
+        subsetter.subset(font)
+        stem = font_file.with_name(f"{font_file.stem}-subset")
+        return _save_flavors(font, stem, report)